@@ -0,0 +1,181 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+MISSING = object()
+
+
+class LRUCache:
+    """Size-bounded in-process cache with per-entry expiry."""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """In-process LRU (L1) in front of a shared Django cache (L2).
+
+    Entries may carry tags. Each tag has a random version stored in L2
+    and mixed into the keys of the entries tagged with it, so bumping
+    the version invalidates all of them at once in every process. Tag
+    versions are kept in L1 for ``TAG_TIMEOUT`` seconds, which bounds
+    how long another process may keep serving an invalidated entry.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.l1 = LRUCache(options['L1_MAX_SIZE'], options['L1_TIMEOUT'])
+        self.version = options.get('VERSION', 1)
+        self.stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'computed': 0}
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    @property
+    def l2(self):
+        # Looked up on use, so overridden CACHES settings take effect.
+        return caches[self.options['L2']]
+
+    def _tag_versions(self, tags):
+        versions = []
+        for tag in tags:
+            key = f'tag:{tag}'
+            version = self.l1.get(key)
+            if version is MISSING:
+                version = self.l2.get(key)
+                if version is None:
+                    self.l2.add(key, uuid.uuid4().hex[:8], None)
+                    version = self.l2.get(key)
+                self.l1.set(key, version, self.options['TAG_TIMEOUT'])
+            versions.append(version)
+        return versions
+
+    def make_key(self, key, tags=()):
+        return ':'.join(
+            [f'v{self.version}', key] + self._tag_versions(tags)
+        )
+
+    def get(self, key, default=None, tags=()):
+        full_key = self.make_key(key, tags)
+        value = self.l1.get(full_key)
+        if value is not MISSING:
+            self.stats['l1_hits'] += 1
+            return value
+        value = self.l2.get(full_key, MISSING)
+        if value is not MISSING:
+            self.stats['l2_hits'] += 1
+            self.l1.set(full_key, value)
+            return value
+        self.stats['misses'] += 1
+        return default
+
+    def set(self, key, value, timeout=None, tags=()):
+        if timeout is None:
+            timeout = self.options['TIMEOUT']
+        full_key = self.make_key(key, tags)
+        self.l2.set(full_key, value, timeout)
+        self.l1.set(full_key, value, min(timeout, self.l1.timeout))
+
+    def delete(self, key, tags=()):
+        full_key = self.make_key(key, tags)
+        self.l1.delete(full_key)
+        self.l2.delete(full_key)
+
+    def get_or_set(self, key, func, timeout=None, tags=()):
+        """Return the cached value, computing it at most once at a time.
+
+        Concurrent misses for one key inside a process wait for a single
+        computation; other processes are held back by a short lock entry
+        in L2 and fall back to computing themselves if it outlives
+        ``LOCK_TIMEOUT``.
+        """
+        value = self.get(key, MISSING, tags)
+        if value is not MISSING:
+            return value
+        with self._flights_lock:
+            lock = self._flights.setdefault(key, threading.Lock())
+        with lock:
+            value = self.get(key, MISSING, tags)
+            if value is not MISSING:
+                return value
+            lock_key = f'lock:{self.make_key(key, tags)}'
+            deadline = time.monotonic() + self.options['LOCK_TIMEOUT']
+            while not self.l2.add(
+                lock_key, 1, self.options['LOCK_TIMEOUT']
+            ):
+                if time.monotonic() > deadline:
+                    break
+                time.sleep(0.05)
+                value = self.get(key, MISSING, tags)
+                if value is not MISSING:
+                    return value
+            try:
+                value = func()
+                self.stats['computed'] += 1
+                self.set(key, value, timeout, tags)
+            finally:
+                self.l2.delete(lock_key)
+                with self._flights_lock:
+                    self._flights.pop(key, None)
+        return value
+
+    def invalidate_tags(self, *tags):
+        for tag in tags:
+            key = f'tag:{tag}'
+            version = uuid.uuid4().hex[:8]
+            self.l2.set(key, version, None)
+            self.l1.set(key, version, self.options['TAG_TIMEOUT'])
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+    def get_stats(self):
+        return dict(
+            self.stats,
+            l1_size=len(self.l1),
+            l1_evictions=self.l1.evictions,
+        )
+
+
+cache = TieredCache(settings.TIERED_CACHE)
@@ -0,0 +1,68 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedCounter:
+    """Per-process counter buffer flushed to storage in batches.
+
+    ``incr`` only touches memory. Pending increments are handed to
+    ``flush_func`` as one ``{key: delta}`` mapping by the background
+    thread every ``interval`` seconds, when more than ``max_pending``
+    keys have piled up, and at exit once ``start`` has been called. A
+    failed flush puts the increments back so the next one retries them.
+    """
+
+    def __init__(self, flush_func, interval, max_pending):
+        self.flush_func = flush_func
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def incr(self, key, delta=1):
+        with self._lock:
+            self._pending[key] += delta
+            overflow = len(self._pending) > self.max_pending
+        if overflow:
+            self.flush()
+
+    def pending(self, key):
+        with self._lock:
+            return self._pending.get(key, 0)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+            if not pending:
+                return
+            try:
+                self.flush_func(dict(pending))
+            except Exception:
+                logger.exception('Counter flush failed')
+                with self._lock:
+                    self._pending.update(pending)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            close_old_connections()
+            self.flush()
+        connection.close()
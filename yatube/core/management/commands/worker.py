@@ -0,0 +1,68 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from core.tasks import queue_depth, run_batch, run_pending
+
+
+class Command(BaseCommand):
+    help = 'Run background task workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=settings.TASKS_WORKERS,
+        )
+        parser.add_argument(
+            '--poll', type=float, default=settings.TASKS_POLL_INTERVAL,
+            help='Pause when the queue is empty, in seconds',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the queue and exit',
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Print queue depth per task kind and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for kind, row in queue_depth().items():
+                self.stdout.write(
+                    f'{kind}: total={row["total"]} ready={row["ready"]} '
+                    f'failed={row["failed"]}'
+                )
+            return
+        if options['once']:
+            done = run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Done, {done} tasks'))
+            return
+        stop = threading.Event()
+        workers = [
+            threading.Thread(
+                target=self.work, args=(stop, options['poll']), daemon=True
+            )
+            for _ in range(options['threads'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'Started {len(workers)} workers')
+        try:
+            while any(worker.is_alive() for worker in workers):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+    def work(self, stop, poll):
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                if not run_batch():
+                    stop.wait(poll)
+        finally:
+            connection.close()
@@ -0,0 +1,92 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        token, *params = part.strip().lower().split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if token and quality > 0:
+            accepted.add(token)
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """Serve collected static files, precompressed where possible.
+
+    Requests under ``STATIC_URL`` for a file present in ``STATIC_ROOT``
+    get the ``.br`` or ``.gz`` sibling written by ``collectstatic`` when
+    the client accepts it. Content-hashed names never change, so they
+    are cached for ``STATIC_IMMUTABLE_MAX_AGE`` and marked immutable;
+    anything else falls through to the next handler.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._manifest = None
+        self._hashed = frozenset()
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and settings.STATIC_ROOT:
+            response = self.serve(request)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def is_hashed(self, name):
+        manifest = staticfiles_storage.hashed_files
+        if manifest is not self._manifest:
+            self._manifest = manifest
+            self._hashed = frozenset(manifest.values())
+        return name in self._hashed
+
+    def serve(self, request):
+        if not request.path.startswith(settings.STATIC_URL):
+            return None
+        name = request.path[len(settings.STATIC_URL):]
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except ValueError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        encoding = None
+        for token, suffix in ENCODINGS:
+            if token in accepted and os.path.isfile(path + suffix):
+                encoding, path = token, path + suffix
+                break
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=mimetypes.guess_type(name)[0]
+            or 'application/octet-stream',
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if self.is_hashed(name):
+            response['Cache-Control'] = (
+                f'public, max-age={settings.STATIC_IMMUTABLE_MAX_AGE}, '
+                'immutable'
+            )
+        else:
+            response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+        return response
@@ -0,0 +1,21 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    kind = models.CharField(max_length=100)
+    payload = models.TextField(default='{}')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    lock_token = models.CharField(max_length=32, blank=True)
+    failed = models.BooleanField(default=False)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk}'
+
+    class Meta:
+        ordering = ('pk',)
+        index_together = (('failed', 'run_after'),)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+ESTIMATE_QUERIES = {
+    'postgresql': (
+        'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    ),
+    'mysql': (
+        'SELECT table_rows FROM information_schema.tables '
+        'WHERE table_schema = DATABASE() AND table_name = %s'
+    ),
+    # Filled in by ANALYZE; the first number of ``stat`` is the row count.
+    'sqlite': 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+}
+
+
+def estimate_count(model, using='default'):
+    """Row count of ``model``'s table from planner statistics, or None."""
+    connection = connections[using]
+    sql = ESTIMATE_QUERIES.get(connection.vendor)
+    if sql is None:
+        return None
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+        try:
+            cursor.execute(sql, [model._meta.db_table])
+        except DatabaseError:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    return int(str(row[0]).split()[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts more than ``COUNT_LIMIT`` rows.
+
+    An unfiltered queryset is counted from the table statistics once it
+    is known to be large, a filtered one is counted up to the limit only;
+    ``estimated`` tells whether ``count`` is exact.
+    """
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_COUNT_LIMIT
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > limit:
+                self.estimated = True
+                return estimate
+        count = queryset.order_by()[:limit + 1].count()
+        if count > limit:
+            self.estimated = True
+        return count
@@ -0,0 +1,52 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+def client_key(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def hit(name, ident):
+    """Take a token from the bucket; return the seconds to wait, or 0.
+
+    ``RATELIMITS[name]`` is ``(count, period)``: bursts of up to
+    ``count`` requests, refilled at ``count`` per ``period`` seconds.
+    The bucket is kept as its theoretical arrival time (GCRA), a single
+    timestamp, so a check is one read plus one write of the shared cache.
+    """
+    count, period = settings.RATELIMITS[name]
+    interval = period / count
+    store = caches[settings.RATELIMIT_CACHE]
+    key = f'ratelimit:{name}:{ident}'
+    now = time.time()
+    arrival = max(store.get(key, now), now)
+    wait = arrival - now - (period - interval)
+    if wait > 0:
+        return wait
+    store.set(key, arrival + interval, math.ceil(arrival + interval - now))
+    return 0
+
+
+def ratelimit(name, methods=('POST',)):
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods and name in settings.RATELIMITS:
+                wait = hit(name, client_key(request))
+                if wait:
+                    response = HttpResponse(
+                        'Слишком много запросов, попробуйте позже',
+                        status=429,
+                    )
+                    response['Retry-After'] = math.ceil(wait)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
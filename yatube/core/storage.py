@@ -0,0 +1,65 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.map')
+
+
+def _gzip(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+ENCODERS = {'.gz': _gzip}
+if brotli is not None:
+    ENCODERS['.br'] = _brotli
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Content-hashed static files with ``.gz``/``.br`` siblings.
+
+    The compressed copies are written after hashing, from a thread pool
+    (zlib and brotli release the GIL), and only where they are smaller
+    than the original. Brotli copies need the ``brotli`` package from
+    the requirements; without it only ``.gz`` copies are written. Until
+    ``collectstatic`` has written a manifest, names are served as they
+    are, so development and tests need no build step.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = {
+            name for pair in self.hashed_files.items() for name in pair
+            if name.endswith(COMPRESSIBLE)
+        }
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            list(pool.map(self.compress, sorted(names)))
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        for suffix, encode in ENCODERS.items():
+            compressed = encode(data)
+            if len(compressed) < len(data):
+                with open(path + suffix, 'wb') as output:
+                    output.write(compressed)
+            elif os.path.exists(path + suffix):
+                os.remove(path + suffix)
@@ -0,0 +1,127 @@
+import json
+import logging
+import uuid
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def handler(kind, batch_size=None, atomic=True):
+    """Register ``func(payloads)`` as the handler for tasks of ``kind``.
+
+    Ready tasks of one kind are handed over together, up to
+    ``batch_size`` payloads per call. With ``atomic=False`` the handler
+    runs outside a transaction: handlers with side effects beyond the
+    database commit their own progress as they go.
+    """
+    def decorator(func):
+        _handlers[kind] = (
+            func, batch_size or settings.TASKS_BATCH_SIZE, atomic,
+        )
+        return func
+    return decorator
+
+
+def enqueue(kind, delay=0, **payload):
+    return Task.objects.create(
+        kind=kind,
+        payload=json.dumps(payload),
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def _ready(now):
+    return Task.objects.filter(failed=False, run_after__lte=now).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    )
+
+
+def claim(now=None):
+    """Lease a batch of ready tasks of one kind to the caller.
+
+    The lease is taken with a conditional UPDATE, so two workers never
+    hold the same task; a crashed worker's lease simply expires and the
+    task is handed out again.
+    """
+    now = now or timezone.now()
+    ready = _ready(now).filter(kind__in=list(_handlers))
+    first = ready.only('kind').first()
+    if first is None:
+        return []
+    _, batch_size, _ = _handlers[first.kind]
+    ids = list(
+        ready.filter(kind=first.kind).values_list('pk', flat=True)
+        [:batch_size]
+    )
+    token = uuid.uuid4().hex
+    _ready(now).filter(pk__in=ids).update(
+        locked_until=now + timedelta(seconds=settings.TASKS_LEASE_SECONDS),
+        lock_token=token,
+    )
+    return list(Task.objects.filter(pk__in=ids, lock_token=token))
+
+
+def _retry(tasks, error):
+    now = timezone.now()
+    for task in tasks:
+        task.attempts += 1
+        task.failed = task.attempts >= settings.TASKS_MAX_ATTEMPTS
+        task.run_after = now + timedelta(seconds=min(
+            settings.TASKS_RETRY_BACKOFF * 2 ** (task.attempts - 1),
+            settings.TASKS_RETRY_BACKOFF_MAX,
+        ))
+        task.locked_until = None
+        task.lock_token = ''
+        task.last_error = error
+        task.save(update_fields=[
+            'attempts', 'failed', 'run_after', 'locked_until',
+            'lock_token', 'last_error',
+        ])
+
+
+def run_batch():
+    tasks = claim()
+    if not tasks:
+        return 0
+    func, _, atomic = _handlers[tasks[0].kind]
+    try:
+        with transaction.atomic() if atomic else nullcontext():
+            func([json.loads(task.payload) for task in tasks])
+            Task.objects.filter(pk__in=[task.pk for task in tasks]).delete()
+    except Exception as error:
+        logger.exception('Task batch %s failed', tasks[0].kind)
+        _retry(tasks, repr(error))
+    return len(tasks)
+
+
+def run_pending(limit=None):
+    done = 0
+    while limit is None or done < limit:
+        processed = run_batch()
+        if not processed:
+            break
+        done += processed
+    return done
+
+
+def queue_depth():
+    now = timezone.now()
+    stats = {}
+    rows = Task.objects.values('kind').annotate(
+        total=Count('pk'),
+        ready=Count('pk', filter=Q(failed=False, run_after__lte=now)),
+        failed=Count('pk', filter=Q(failed=True)),
+    ).order_by('kind')
+    for row in rows:
+        stats[row.pop('kind')] = row
+    return stats
@@ -0,0 +1,242 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache import MISSING, LRUCache, cache
+from .middleware import accepted_encodings
+from .models import Task
+from .ratelimit import hit
+from .tasks import claim, enqueue, handler, queue_depth, run_pending
+
+processed = []
+
+
+@handler('core.test_collect', batch_size=3)
+def collect(payloads):
+    processed.append([payload['n'] for payload in payloads])
+
+
+@handler('core.test_fail')
+def fail(payloads):
+    raise RuntimeError('boom')
+
+
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        processed.clear()
+
+    def test_tasks_of_one_kind_batched(self):
+        """Задачи одного вида выполняются пачками и удаляются"""
+        for n in range(5):
+            enqueue('core.test_collect', n=n)
+        self.assertEqual(queue_depth()['core.test_collect']['ready'], 5)
+        self.assertEqual(run_pending(), 5)
+        self.assertEqual(processed, [[0, 1, 2], [3, 4]])
+        self.assertFalse(Task.objects.exists())
+
+    def test_claimed_tasks_not_handed_out_twice(self):
+        """Взятая в работу задача не выдаётся повторно до конца аренды"""
+        enqueue('core.test_collect', n=1)
+        self.assertEqual(len(claim()), 1)
+        self.assertEqual(claim(), [])
+        expired = timezone.now() + timedelta(days=1)
+        self.assertEqual(len(claim(now=expired)), 1)
+
+    @override_settings(TASKS_MAX_ATTEMPTS=2)
+    def test_failed_task_retried_with_backoff(self):
+        """Упавшая задача откладывается, затем помечается как проваленная"""
+        task = enqueue('core.test_fail')
+        with self.assertLogs('core.tasks', 'ERROR'):
+            run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.attempts, 1)
+        self.assertFalse(task.failed)
+        self.assertGreater(task.run_after, timezone.now())
+        Task.objects.update(run_after=timezone.now())
+        with self.assertLogs('core.tasks', 'ERROR'):
+            run_pending()
+        task.refresh_from_db()
+        self.assertTrue(task.failed)
+        self.assertIn('boom', task.last_error)
+        self.assertEqual(queue_depth()['core.test_fail']['failed'], 1)
+
+
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_lru_evicts_oldest_and_expires(self):
+        """L1 вытесняет давние записи и забывает просроченные"""
+        lru = LRUCache(max_size=2, timeout=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIs(lru.get('b'), MISSING)
+        self.assertEqual(lru.evictions, 1)
+        lru.set('d', 4, timeout=-1)
+        self.assertEqual(len(lru), 2)
+
+    def test_tag_invalidation(self):
+        """Сброс тега делает недоступными все помеченные им записи"""
+        cache.set('one', 1, tags=('a',))
+        cache.set('two', 2, tags=('a', 'b'))
+        cache.set('three', 3, tags=('b',))
+        cache.invalidate_tags('a')
+        self.assertIsNone(cache.get('one', tags=('a',)))
+        self.assertIsNone(cache.get('two', tags=('a', 'b')))
+        self.assertEqual(cache.get('three', tags=('b',)), 3)
+
+    def test_l2_follows_settings(self):
+        """L2 берётся из текущих настроек, тесты не трогают кэш на диске"""
+        self.assertIsInstance(cache.l2, LocMemCache)
+        dummy = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        with override_settings(CACHES={'shared': dummy}):
+            self.assertIsInstance(cache.l2, DummyCache)
+
+    def test_l2_hit_after_l1_loss(self):
+        """Запись, вытесненная из L1, читается из общего кэша"""
+        cache.set('key', 'value')
+        cache.l1.clear()
+        hits = cache.get_stats()['l2_hits']
+        self.assertEqual(cache.get('key'), 'value')
+        self.assertEqual(cache.get_stats()['l2_hits'], hits + 1)
+
+    def test_single_flight(self):
+        """Одновременные промахи вычисляют значение один раз"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    cache.get_or_set('popular', compute)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 10)
+
+
+@override_settings(RATELIMITS={
+    'users:login': (2, 60), 'posts:post_create': (1, 60),
+})
+class RateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_burst_then_429(self):
+        """После исчерпания лимита возвращается 429 с Retry-After"""
+        url = reverse('users:login')
+        data = {'username': 'nobody', 'password': 'wrong'}
+        for _ in range(2):
+            self.assertEqual(
+                self.guest_client.post(url, data).status_code, 200)
+        response = self.guest_client.post(url, data)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(self.guest_client.get(url).status_code, 200)
+
+    def test_limits_are_per_client(self):
+        """Лимиты считаются отдельно для каждого пользователя"""
+        url = reverse('posts:post_create')
+        for username in ('first', 'second'):
+            client = Client()
+            client.force_login(
+                get_user_model().objects.create_user(username=username))
+            client.post(url, {'text': f'Пост {username}'})
+            response = client.post(url, {'text': f'Ещё пост {username}'})
+            self.assertEqual(response.status_code, 429)
+        self.assertEqual(hit('users:login', 'ip:10.0.0.1'), 0)
+
+
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT)
+class StaticPipelineTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_static_tag_uses_hashed_names(self):
+        """Тег static отдаёт имена с хешем содержимого"""
+        url = Template(
+            "{% load static %}{% static 'css/bootstrap.min.css' %}"
+        ).render(Context())
+        self.assertRegex(url, r'^/static/css/bootstrap\.min\.\w{12}\.css$')
+        name = url[len('/static/'):]
+        for suffix in ('.gz', '.br'):
+            self.assertTrue(
+                os.path.exists(os.path.join(STATIC_ROOT, name + suffix)))
+        self.assertFalse(os.path.exists(
+            os.path.join(STATIC_ROOT, 'img/logo.png.gz')))
+
+    def test_precompressed_and_immutable(self):
+        """Сжатая версия отдаётся с бессрочным кешированием"""
+        url = staticfiles_storage.url('css/bootstrap.min.css')
+        response = self.guest_client.get(
+            url, HTTP_ACCEPT_ENCODING='deflate, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        response = self.guest_client.get(
+            url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        response = self.guest_client.get(
+            url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.guest_client.get('/static/css/bootstrap.min.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+        response = self.guest_client.get('/static/../manage.py')
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_unhashed_without_manifest(self):
+        """Без collectstatic используются исходные имена"""
+        root = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, root)
+        with override_settings(STATIC_ROOT=root):
+            self.assertEqual(
+                staticfiles_storage.url('css/bootstrap.min.css'),
+                '/static/css/bootstrap.min.css',
+            )
+
+    def test_accepted_encodings(self):
+        """Разбор Accept-Encoding учитывает q=0"""
+        self.assertEqual(
+            accepted_encodings('gzip, br;q=0, deflate;q=0.5'),
+            {'gzip', 'deflate'},
+        )
@@ -1,15 +1,245 @@
-from django.contrib import admin
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Q
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import reverse
 
-from .models import Group, Post
+from core.paginator import EstimatedCountPaginator
+
+from . import timeline
+from .bulk import delete_posts, set_group
+from .deletion import schedule_deletion
+from .lookups import group_prefix
+from .models import Comment, DeletionJob, Group, Post, recount_comments
+from .widgets import AutocompleteSelect
+
+
+def schedule_deletion_action(modeladmin, request, queryset):
+    for obj in queryset:
+        schedule_deletion(obj)
+    modeladmin.message_user(
+        request, f'Поставлено в очередь на удаление: {len(queryset)}'
+    )
+
+
+schedule_deletion_action.short_description = 'Удалить в фоне'
+
+
+class ScheduledDeletionMixin:
+    """Send every admin deletion through the background deletion jobs.
+
+    The delete button, like the action, only schedules a job, and the
+    confirmation page does not collect the whole cascade to list it.
+    """
+
+    actions = (schedule_deletion_action,)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        schedule_deletion(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            schedule_deletion(obj)
+
+    def response_delete(self, request, obj_display, obj_id):
+        self.message_user(
+            request, f'Поставлено в очередь на удаление: {obj_display}'
+        )
+        opts = self.model._meta
+        return HttpResponseRedirect(reverse(
+            f'admin:{opts.app_label}_{opts.model_name}_changelist',
+            current_app=self.admin_site.name,
+        ))
+
+
+class PostActionForm(helpers.ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа',
+        widget=AutocompleteSelect('posts:group_autocomplete'),
+    )
+
+
+def move_to_group_action(modeladmin, request, queryset):
+    form = modeladmin.action_form(request.POST)
+    form.fields['action'].choices = modeladmin.get_action_choices(request)
+    group = form.cleaned_data['group'] if form.is_valid() else None
+    if group is None:
+        modeladmin.message_user(request, 'Выберите группу', messages.ERROR)
+        return
+    moved = set_group(queryset, group, settings.POSTS_BULK_CHUNK_SIZE)
+    modeladmin.message_user(
+        request, f'Перенесено в группу «{group}»: {moved}'
+    )
+
+
+move_to_group_action.short_description = 'Перенести в группу'
+
+
+def clear_group_action(modeladmin, request, queryset):
+    moved = set_group(queryset, None, settings.POSTS_BULK_CHUNK_SIZE)
+    modeladmin.message_user(request, f'Убрано из групп: {moved}')
+
+
+clear_group_action.short_description = 'Убрать из группы'
+
+
+def delete_posts_action(modeladmin, request, queryset):
+    if request.POST.get('post'):
+        deleted = delete_posts(queryset, settings.POSTS_BULK_CHUNK_SIZE)
+        modeladmin.message_user(request, f'Удалено постов: {deleted}')
+        return None
+    return TemplateResponse(
+        request,
+        'admin/posts/post/delete_posts_confirmation.html',
+        {
+            **modeladmin.admin_site.each_context(request),
+            'title': 'Удаление постов',
+            'opts': modeladmin.model._meta,
+            'media': modeladmin.media,
+            'count': queryset.count(),
+            'select_across': request.POST.get('select_across', '0'),
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        },
+    )
+
+
+delete_posts_action.short_description = 'Удалить выбранные посты'
+
+
+CURSOR_VAR = 'before'
+
+
+class KeysetChangeList(ChangeList):
+    """Changelist paging by ``(pub_date, pk)`` instead of OFFSET.
+
+    Used while the default newest-first ordering is in effect; any other
+    ordering falls back to numbered pages.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = timeline.decode_cursor(request.GET.get(CURSOR_VAR))
+        super().__init__(request, *args, **kwargs)
+        self.params.pop(CURSOR_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        self.keyset = not self.show_all and list(
+            self.queryset.query.order_by
+        ) == ['-pub_date', '-pk']
+        if not self.keyset:
+            super().get_results(request)
+            self.count_estimated = self.paginator.estimated
+            return
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        result_list = self.queryset
+        if self.cursor:
+            pub_date, pk = self.cursor
+            result_list = result_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        result_list = result_list[:self.list_per_page]
+        # Fills the queryset's own result cache, so the rows are fetched
+        # once; result_list stays a queryset for the list_editable formset.
+        rows = list(result_list)
+        self.next_url = self.first_url = None
+        if len(rows) == self.list_per_page:
+            self.next_url = self.get_query_string({
+                CURSOR_VAR: timeline.encode_cursor(
+                    rows[-1].pub_date, rows[-1].pk
+                ),
+            })
+        if self.cursor:
+            # Runs inside ChangeList.__init__, before the cursor is
+            # dropped from self.params.
+            self.first_url = self.get_query_string(remove=[CURSOR_VAR])
+        self.result_count = paginator.count
+        self.count_estimated = paginator.estimated
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.next_url or self.first_url)
+        self.paginator = paginator
 
 
 class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_display = (
+        'pk', 'text', 'pub_date', 'author', 'group', 'views', 'is_flagged'
+    )
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', 'is_flagged')
     empty_value_display = '-пусто-'
+    autocomplete_fields = ('group',)
+    list_select_related = ('author', 'group')
+    date_hierarchy = 'pub_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = (move_to_group_action, clear_group_action, delete_posts_action)
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+
+class GroupAdmin(ScheduledDeletionMixin, admin.ModelAdmin):
+    search_fields = ('title',)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(group_prefix(search_term)), False
+
+
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'target', 'object_id', 'processed', 'created',
+                    'finished')
+    list_filter = ('target', 'finished')
+
+
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'post_id', 'author', 'text', 'created')
+    list_select_related = ('author',)
+    raw_id_fields = ('post', 'author')
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recount_comments([obj.post_id])
+
+    def delete_queryset(self, request, queryset):
+        post_ids = set(queryset.values_list('post_id', flat=True))
+        super().delete_queryset(request, queryset)
+        recount_comments(post_ids)
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(DeletionJob, DeletionJobAdmin)
+admin.site.register(Comment, CommentAdmin)
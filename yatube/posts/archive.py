@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+
+from .deletion import pending
+from .models import ArchivedPost, DeletionJob, Post
+
+
+class ChainedPosts:
+    """Hot posts followed by archived ones, sliceable like a queryset.
+
+    Every archived post is older than every hot one, so the two tables
+    concatenated keep the feed ordering and only pages past the end of
+    the hot table touch the archive. A ``total`` known in advance saves
+    counting both tables.
+    """
+
+    ordered = True
+
+    def __init__(self, hot, cold, total=None):
+        self.hot = hot
+        self.cold = cold
+        self.total = total
+        self._hot_count = None
+        self._cold_count = None
+
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def cold_count(self):
+        if self._cold_count is None:
+            self._cold_count = self.cold.count()
+        return self._cold_count
+
+    def count(self):
+        if self.total is not None:
+            return self.total
+        return self.hot_count() + self.cold_count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        hot_count = self.hot_count()
+        result = []
+        if start < hot_count:
+            result.extend(self.hot[start:min(stop, hot_count)])
+        if stop > hot_count:
+            result.extend(
+                self.cold[max(start - hot_count, 0):stop - hot_count]
+            )
+        return result
+
+
+def chained(**filters):
+    hidden = pending(DeletionJob.USER)
+    return ChainedPosts(
+        Post.objects.filter(**filters).exclude(author__in=hidden),
+        ArchivedPost.objects.filter(**filters).exclude(author__in=hidden),
+    )
+
+
+def get_post_or_404(post_id):
+    hidden = pending(DeletionJob.USER)
+    post = Post.objects.exclude(author__in=hidden).filter(pk=post_id).first()
+    if post is None:
+        post = ArchivedPost.objects.exclude(
+            author__in=hidden).filter(pk=post_id).first()
+    if post is None:
+        raise Http404('No post matches the given query.')
+    return post
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = settings.POSTS_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(cutoff, batch_size):
+    ids = list(
+        Post.objects.filter(pub_date__lt=cutoff)
+        .order_by('pk')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    with transaction.atomic():
+        batch = Post.objects.filter(pk__in=ids)
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost.from_post(post) for post in batch
+        )
+        batch.delete()
+    return len(ids)
@@ -0,0 +1,79 @@
+from django.db import models, transaction
+
+from core.cache import cache
+
+from . import group_stats, months
+from .models import Post, drop_post_dependents
+
+
+def _chunks(queryset, chunk_size):
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = 0
+    while True:
+        chunk = list(ids.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]
+
+
+def set_group(queryset, group, chunk_size):
+    """Move the posts of ``queryset`` to ``group`` (or out of any group).
+
+    Runs one UPDATE per chunk of ids and drops the cached feeds of every
+    group involved; return the number of posts moved.
+    """
+    group_id = group.pk if group else None
+    group_ids = {group_id}
+    total = 0
+    for ids in _chunks(queryset, chunk_size):
+        with transaction.atomic():
+            batch = Post.objects.filter(pk__in=ids).exclude(group_id=group_id)
+            group_ids.update(
+                batch.values_list('group_id', flat=True).distinct()
+            )
+            counts = months.regroup(batch, group_id)
+            total += batch.update(group_id=group_id)
+            months.add(counts)
+    group_stats.refresh(group_ids)
+    cache.invalidate_tags(*(
+        f'group:{group_id}' for group_id in group_ids if group_id
+    ))
+    return total
+
+
+def delete_posts(queryset, chunk_size):
+    """Delete the posts of ``queryset`` with set-based statements.
+
+    Per chunk, the rows depending on the posts are deleted first: those
+    Django would cascade to and those kept without a constraint. Then
+    the posts go in one DELETE without per-row signals. The feeds of the
+    authors and groups involved are dropped at the end.
+    """
+    cascades = [
+        relation for relation in Post._meta.related_objects
+        if relation.on_delete is models.CASCADE
+    ]
+    tags = {'feed'}
+    group_ids = set()
+    total = 0
+    for ids in _chunks(queryset, chunk_size):
+        with transaction.atomic():
+            batch = Post.objects.filter(pk__in=ids)
+            for author_id, group_id in batch.values_list(
+                'author_id', 'group_id'
+            ).distinct():
+                tags.add(f'author:{author_id}')
+                if group_id:
+                    tags.add(f'group:{group_id}')
+                    group_ids.add(group_id)
+            for relation in cascades:
+                relation.related_model._base_manager.filter(**{
+                    f'{relation.field.name}__in': ids,
+                }).delete()
+            drop_post_dependents(ids)
+            months.add(months.tally(batch, sign=-1))
+            total += batch._raw_delete(batch.db)
+    group_stats.refresh(group_ids)
+    cache.invalidate_tags(*tags)
+    return total
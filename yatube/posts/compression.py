@@ -0,0 +1,84 @@
+import zlib
+
+from django.conf import settings
+from django.utils.functional import lazy
+
+RAW = b'\x00'
+ZLIB = b'\x01'
+SEPARATOR = '\x00'
+
+PACKED_FIELDS = ('text', 'text_html')
+
+
+def pack(*parts):
+    data = SEPARATOR.join(parts).encode()
+    compressed = zlib.compress(data, settings.POSTS_COMPRESS_LEVEL)
+    if len(compressed) < len(data):
+        return ZLIB + compressed
+    return RAW + data
+
+
+def unpack(blob):
+    blob = bytes(blob)
+    marker, data = blob[:1], blob[1:]
+    if marker == ZLIB:
+        data = zlib.decompress(data)
+    elif marker != RAW:
+        raise ValueError(f'Unknown packed body marker {marker!r}')
+    return data.decode().split(SEPARATOR)
+
+
+def should_pack(text):
+    return (
+        settings.POSTS_COMPRESS_BODY
+        and len(text) >= settings.POSTS_COMPRESS_MIN_LENGTH
+    )
+
+
+class PackedBody:
+    """Decompresses a packed body once, on first access to any part."""
+
+    def __init__(self, blob):
+        self.blob = blob
+        self._parts = None
+
+    def part(self, index):
+        if self._parts is None:
+            self._parts = unpack(self.blob)
+        return self._parts[index]
+
+    def lazy(self, index):
+        return lazy(self.part, str)(index)
+
+
+def pack_instance(post):
+    """Move the body of ``post`` into body_packed when it is large."""
+    text = str(post.text)
+    html = str(post.text_html)
+    if should_pack(text):
+        post.body_packed = pack(text, html)
+        post.text = post.text_html = ''
+    else:
+        post.body_packed = None
+        post.text, post.text_html = text, html
+    return text, html
+
+
+def unpack_instance(post):
+    if post.__dict__.get('body_packed'):
+        body = PackedBody(post.body_packed)
+        for index, name in enumerate(PACKED_FIELDS):
+            setattr(post, name, body.lazy(index))
+
+
+class PackedBodyMixin:
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        unpack_instance(instance)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        if fields is not None and set(fields) & set(PACKED_FIELDS):
+            fields = set(fields) | set(PACKED_FIELDS) | {'body_packed'}
+        super().refresh_from_db(using, fields)
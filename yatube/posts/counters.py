@@ -0,0 +1,28 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from core.counters import BufferedCounter
+
+from .models import ArchivedPost, Post
+
+
+def flush_views(counts):
+    by_delta = defaultdict(list)
+    for post_id, delta in counts.items():
+        by_delta[delta].append(post_id)
+    with transaction.atomic():
+        for delta, post_ids in by_delta.items():
+            for model in (Post, ArchivedPost):
+                model.objects.filter(pk__in=post_ids).update(
+                    views=F('views') + delta
+                )
+
+
+post_views = BufferedCounter(
+    flush_views,
+    interval=settings.POSTS_VIEWS_FLUSH_INTERVAL,
+    max_pending=settings.POSTS_VIEWS_MAX_PENDING,
+)
@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.utils import timezone
+
+from core.tasks import enqueue
+
+from .models import (
+    ArchivedPost, Comment, DeletionJob, Group, Post, recount_comments
+)
+
+User = get_user_model()
+
+TARGET_MODELS = {
+    DeletionJob.USER: User,
+    DeletionJob.GROUP: Group,
+}
+
+
+def pending(target):
+    return DeletionJob.objects.filter(
+        target=target, finished__isnull=True
+    ).values('object_id')
+
+
+def is_pending(target, object_id):
+    return pending(target).filter(object_id=object_id).exists()
+
+
+def schedule_deletion(obj):
+    target = DeletionJob.USER if isinstance(obj, User) else DeletionJob.GROUP
+    if target == DeletionJob.USER and obj.is_active:
+        obj.is_active = False
+        obj.save(update_fields=['is_active'])
+    job, created = DeletionJob.objects.get_or_create(
+        target=target, object_id=obj.pk
+    )
+    if created:
+        enqueue('posts.process_deletion', job_id=job.pk)
+    return job
+
+
+def _batch_ids(queryset, batch_size):
+    return list(
+        queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]
+    )
+
+
+def _process_user(job, batch_size):
+    for model in (Post, ArchivedPost):
+        ids = _batch_ids(
+            model.objects.filter(author_id=job.object_id), batch_size
+        )
+        if ids:
+            model.objects.filter(pk__in=ids).delete()
+            return len(ids)
+    return 0
+
+
+def _process_group(job, batch_size):
+    for model in (Post, ArchivedPost):
+        ids = _batch_ids(
+            model.objects.filter(group_id=job.object_id), batch_size
+        )
+        if ids:
+            model.objects.filter(pk__in=ids).update(group=None)
+            return len(ids)
+    return 0
+
+
+def _process_dependents(job, batch_size):
+    """Delete one batch of the rows that would cascade from the target.
+
+    Runs once the posts are gone, so the final delete of the user or
+    group no longer drags their comments, follows and timelines along
+    in a single transaction.
+    """
+    target = TARGET_MODELS[job.target]
+    for relation in target._meta.related_objects:
+        if relation.on_delete is not models.CASCADE:
+            continue
+        related = relation.related_model
+        ids = _batch_ids(related._base_manager.filter(**{
+            relation.field.name: job.object_id,
+        }), batch_size)
+        if not ids:
+            continue
+        batch = related._base_manager.filter(pk__in=ids)
+        if related is Comment:
+            post_ids = set(batch.values_list('post_id', flat=True))
+            batch.delete()
+            recount_comments(post_ids)
+        else:
+            batch.delete()
+        return len(ids)
+    return 0
+
+
+PROCESSORS = {
+    DeletionJob.USER: _process_user,
+    DeletionJob.GROUP: _process_group,
+}
+
+
+def process_batch(job, batch_size):
+    """Delete or detach one batch of rows; return False once done."""
+    with transaction.atomic():
+        done = PROCESSORS[job.target](job, batch_size)
+        if done:
+            job.processed += done
+            job.save(update_fields=['processed'])
+            return True
+        if _process_dependents(job, batch_size):
+            return True
+        TARGET_MODELS[job.target].objects.filter(pk=job.object_id).delete()
+        job.finished = timezone.now()
+        job.save(update_fields=['finished'])
+    return False
@@ -0,0 +1,136 @@
+import hashlib
+import random
+import re
+import struct
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import PostSignature, SignatureBucket
+
+WORD_RE = re.compile(r'\w+')
+PRIME = (1 << 61) - 1
+MASK = (1 << 64) - 1
+
+
+def _permutations():
+    count = settings.POSTS_DUPLICATE_BANDS * settings.POSTS_DUPLICATE_ROWS
+    rng = random.Random(count)
+    return [
+        (rng.randrange(1, PRIME), rng.randrange(0, PRIME))
+        for _ in range(count)
+    ]
+
+
+PERMUTATIONS = _permutations()
+
+
+def _hash(value):
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+def shingles(text):
+    words = WORD_RE.findall(str(text).lower())
+    if len(words) < settings.POSTS_DUPLICATE_MIN_WORDS:
+        return set()
+    size = settings.POSTS_DUPLICATE_SHINGLE_WORDS
+    return {
+        _hash(' '.join(words[i:i + size]))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def signature(text):
+    """MinHash signature of the word shingles of ``text``, or None.
+
+    Texts shorter than ``POSTS_DUPLICATE_MIN_WORDS`` words get no
+    signature and are never treated as duplicates.
+    """
+    values = shingles(text)
+    if not values:
+        return None
+    return [
+        min((a * value + b) % PRIME for value in values)
+        for a, b in PERMUTATIONS
+    ]
+
+
+def pack(values):
+    return struct.pack(f'>{len(values)}Q', *values)
+
+
+def unpack(data):
+    data = bytes(data)
+    return list(struct.unpack(f'>{len(data) // 8}Q', data))
+
+
+def bucket_keys(values):
+    """Hash every band of the signature into one signed 64-bit key."""
+    rows = settings.POSTS_DUPLICATE_ROWS
+    keys = []
+    for band in range(settings.POSTS_DUPLICATE_BANDS):
+        digest = hashlib.blake2b(
+            pack([band] + values[band * rows:(band + 1) * rows]),
+            digest_size=8,
+        ).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def similarity(left, right):
+    return sum(a == b for a, b in zip(left, right)) / len(left)
+
+
+def find_similar(values, exclude=None):
+    """Return ``(post_id, similarity)`` of the closest indexed post.
+
+    Only posts sharing at least one LSH bucket with ``values`` are
+    compared, newest first and at most ``POSTS_DUPLICATE_MAX_CANDIDATES``
+    of them, so the cost does not grow with the number of posts.
+    """
+    candidates = PostSignature.objects.filter(
+        buckets__key__in=bucket_keys(values)
+    ).exclude(post_id=exclude).order_by('-post_id').distinct()
+    best = (None, 0)
+    for post_id, data in candidates.values_list(
+        'post_id', 'minhash'
+    )[:settings.POSTS_DUPLICATE_MAX_CANDIDATES]:
+        score = similarity(values, unpack(data))
+        if score > best[1]:
+            best = (post_id, score)
+    return best
+
+
+def _buckets(post_id, values):
+    return [
+        SignatureBucket(signature_id=post_id, key=key)
+        for key in bucket_keys(values)
+    ]
+
+
+@transaction.atomic
+def index(post, values):
+    PostSignature.objects.filter(post_id=post.pk).delete()
+    if values is None:
+        return
+    PostSignature.objects.create(post_id=post.pk, minhash=pack(values))
+    SignatureBucket.objects.bulk_create(_buckets(post.pk, values))
+
+
+@transaction.atomic
+def index_batch(posts):
+    signatures = []
+    buckets = []
+    for post in posts:
+        values = signature(post.text)
+        if values is not None:
+            signatures.append(
+                PostSignature(post_id=post.pk, minhash=pack(values))
+            )
+            buckets.extend(_buckets(post.pk, values))
+    PostSignature.objects.filter(post__in=posts).delete()
+    PostSignature.objects.bulk_create(signatures)
+    SignatureBucket.objects.bulk_create(buckets)
+    return len(signatures)
@@ -0,0 +1,76 @@
+from core.cache import cache
+
+from .archive import ChainedPosts, chained
+
+SUMMARY_DEFERRED = ('text', 'text_html', 'body_packed')
+
+
+class CachedPosts:
+    """Feed whose total and page contents are kept in the tiered cache.
+
+    Only the post count and the ids on each page are cached; the posts
+    themselves are loaded by primary key, so edits show up at once.
+    Feeds list previews, so the full bodies are never loaded here.
+    """
+
+    ordered = True
+
+    def __init__(self, key, tags, **filters):
+        self.posts = chained(**filters)
+        self.key = key
+        self.tags = tags
+
+    def count(self):
+        return cache.get_or_set(
+            f'{self.key}:count', self.posts.count, tags=self.tags
+        )
+
+    def __len__(self):
+        return self.count()
+
+    def _refs(self, start, stop):
+        ids_only = ChainedPosts(
+            self.posts.hot.only('pk'), self.posts.cold.only('pk')
+        )
+        return [
+            (post.is_archived, post.pk) for post in ids_only[start:stop]
+        ]
+
+    def __getitem__(self, key):
+        start, stop = key.start or 0, key.stop
+        refs = cache.get_or_set(
+            f'{self.key}:{start}:{stop}',
+            lambda: self._refs(start, stop),
+            tags=self.tags,
+        )
+        loaded = {
+            False: self._load(self.posts.hot, refs, False),
+            True: self._load(self.posts.cold, refs, True),
+        }
+        return [
+            loaded[archived][pk] for archived, pk in refs
+            if pk in loaded[archived]
+        ]
+
+    def _load(self, queryset, refs, archived):
+        return queryset.select_related('author', 'group').defer(
+            *SUMMARY_DEFERRED
+        ).in_bulk([pk for is_archived, pk in refs if is_archived == archived])
+
+
+def index_feed():
+    return CachedPosts('feed:index', ('posts', 'feed'))
+
+
+def group_feed(group):
+    return CachedPosts(
+        f'feed:group:{group.pk}', ('posts', f'group:{group.pk}'),
+        group_id=group.pk,
+    )
+
+
+def author_feed(author):
+    return CachedPosts(
+        f'feed:author:{author.pk}', ('posts', f'author:{author.pk}'),
+        author_id=author.pk,
+    )
@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.forms import ModelForm
 
-from .models import Post
+from . import duplicates
+from .models import Comment, Post
+from .widgets import AutocompleteSelect
 
 User = get_user_model()
 
@@ -14,3 +18,29 @@ class PostForm(ModelForm):
             'group': 'Группа',
             'text': 'Текст',
         }
+        widgets = {
+            'group': AutocompleteSelect('posts:group_autocomplete'),
+        }
+
+    def clean_text(self):
+        text = self.cleaned_data['text']
+        values = duplicates.signature(text)
+        score = 0
+        if values is not None:
+            _, score = duplicates.find_similar(values, self.instance.pk)
+        if score >= settings.POSTS_DUPLICATE_REJECT_THRESHOLD:
+            raise ValidationError('Почти такая же запись уже опубликована')
+        self.instance.is_flagged = (
+            score >= settings.POSTS_DUPLICATE_FLAG_THRESHOLD
+        )
+        self.instance._minhash = values
+        return text
+
+
+class CommentForm(ModelForm):
+    class Meta:
+        model = Comment
+        fields = ['text']
+        labels = {
+            'text': 'Текст комментария',
+        }
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Count, DateTimeField, F, Max, OuterRef, Subquery, Value
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .deletion import pending
+from .models import ArchivedPost, DeletionJob, Group, GroupStats, Post
+
+ORDERINGS = {
+    'posts': ('-posts_count', 'pk'),
+    'recent': ('-recent_count', 'pk'),
+    'last': (F('last_post_date').desc(nulls_last=True), 'pk'),
+    'title': ('group__title_key', 'pk'),
+}
+
+
+def recent_since():
+    return timezone.now() - timedelta(days=settings.POSTS_GROUP_RATE_DAYS)
+
+
+def _latest(model):
+    return Subquery(
+        model.objects.filter(group_id=OuterRef('group_id'))
+        .order_by('-pub_date').values('pub_date')[:1]
+    )
+
+
+def add(group_id, pub_date, delta):
+    """Count one post of ``group_id`` in (or out of) the group stats."""
+    if not group_id or not delta:
+        return
+    rows = GroupStats.objects.filter(group_id=group_id)
+    changes = {'posts_count': Greatest(F('posts_count') + delta, 0)}
+    if pub_date >= recent_since():
+        changes['recent_count'] = Greatest(F('recent_count') + delta, 0)
+    if delta > 0:
+        date = Value(pub_date, output_field=DateTimeField())
+        changes['last_post_date'] = Greatest(
+            Coalesce('last_post_date', date), date
+        )
+    rows.update(**changes)
+    if delta < 0:
+        # Only a removed latest post moves the date, back to the next one.
+        rows.filter(last_post_date__lte=pub_date).update(
+            last_post_date=Coalesce(_latest(Post), _latest(ArchivedPost))
+        )
+
+
+def add_post(post, delta):
+    add(post.group_id, post.pub_date, delta)
+
+
+def regroup_post(post, old_group_id):
+    add(old_group_id, post.pub_date, -1)
+    add(post.group_id, post.pub_date, 1)
+
+
+def refresh(group_ids):
+    """Recompute the stats of the given groups from their posts.
+
+    Runs a few grouped aggregates over the ``(group, pub_date)`` index,
+    so the cost follows the number of posts in these groups only.
+    """
+    group_ids = set(group_ids) - {None}
+    stats = {
+        group_id: GroupStats(group_id=group_id, refreshed=timezone.now())
+        for group_id in Group.objects.filter(
+            pk__in=group_ids
+        ).values_list('pk', flat=True)
+    }
+    for model in (Post, ArchivedPost):
+        rows = model.objects.filter(group_id__in=stats).order_by().values(
+            'group_id'
+        ).annotate(count=Count('pk'), last=Max('pub_date'))
+        for row in rows:
+            item = stats[row['group_id']]
+            item.posts_count += row['count']
+            item.last_post_date = max(
+                filter(None, (item.last_post_date, row['last']))
+            )
+    for group_id, count in Post.objects.filter(
+        group_id__in=stats, pub_date__gte=recent_since()
+    ).order_by().values('group_id').annotate(
+        count=Count('pk')
+    ).values_list('group_id', 'count'):
+        stats[group_id].recent_count = count
+    with transaction.atomic():
+        GroupStats.objects.filter(group_id__in=stats).delete()
+        GroupStats.objects.bulk_create(stats.values())
+    return len(stats)
+
+
+def directory(sort):
+    return GroupStats.objects.select_related('group').exclude(
+        group__in=pending(DeletionJob.GROUP)
+    ).order_by(*ORDERINGS[sort])
+
+
+def refresh_all(batch_size):
+    """Refresh every group, ``batch_size`` groups at a time.
+
+    New posts bump the counts as they are written, but posts age out of
+    the ``POSTS_GROUP_RATE_DAYS`` window silently, so this runs
+    periodically to bring ``recent_count`` down again.
+    """
+    last_pk = 0
+    total = 0
+    ids = Group.objects.order_by('pk').values_list('pk', flat=True)
+    while True:
+        batch = list(ids.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return total
+        total += refresh(batch)
+        last_pk = batch[-1]
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.http import Http404
+
+from core.cache import cache
+
+from .deletion import pending
+from .models import DeletionJob, Group
+
+User = get_user_model()
+
+
+class Record:
+    """Read-only snapshot of the model fields a page needs."""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __reduce__(self):
+        return type(self), tuple(
+            getattr(self, name) for name in self.__slots__
+        )
+
+    @property
+    def pk(self):
+        return self.id
+
+    @classmethod
+    def from_instance(cls, obj):
+        return cls(*(getattr(obj, name) for name in cls.__slots__))
+
+
+class GroupRecord(Record):
+    __slots__ = ('id', 'title', 'slug', 'description')
+
+    def __str__(self):
+        return self.title
+
+
+class UserRecord(Record):
+    __slots__ = ('id', 'username', 'first_name', 'last_name')
+
+    def __str__(self):
+        return self.username
+
+    def as_user(self):
+        return User(**{name: getattr(self, name) for name in self.__slots__})
+
+
+def _lookup(key, load):
+    record = cache.get_or_set(
+        key, lambda: load() or False, tags=(key,)
+    )
+    if not record:
+        raise Http404(f'No {key} found.')
+    return record
+
+
+def get_group_or_404(slug):
+    def load():
+        group = Group.objects.exclude(
+            pk__in=pending(DeletionJob.GROUP)
+        ).filter(slug=slug).only(*GroupRecord.__slots__).first()
+        return group and GroupRecord.from_instance(group)
+    return _lookup(group_key(slug), load)
+
+
+def get_author_or_404(username):
+    def load():
+        user = User.objects.exclude(
+            pk__in=pending(DeletionJob.USER)
+        ).filter(username=username).only(*UserRecord.__slots__).first()
+        return user and UserRecord.from_instance(user)
+    return _lookup(user_key(username), load)
+
+
+def group_key(slug):
+    return f'lookup:group:{slug}'
+
+
+def user_key(username):
+    return f'lookup:user:{username}'
+
+
+def group_prefix(term):
+    """Match groups whose title starts with ``term``, ignoring case.
+
+    A range on the indexed ``title_key`` rather than LIKE, so the lookup
+    is an index range scan on every backend.
+    """
+    key = term.strip().lower()
+    return Q(title_key__gte=key, title_key__lt=key + '\U0010ffff')
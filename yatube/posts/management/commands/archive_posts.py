@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Move posts older than POSTS_ARCHIVE_AFTER_DAYS to the archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POSTS_ARCHIVE_AFTER_DAYS,
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.POSTS_ARCHIVE_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Pause between batches, in seconds',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        total = 0
+        while True:
+            moved = archive_batch(cutoff, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f'Archived {total} posts')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'Done, {total} posts archived'))
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from core.cache import cache
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Report post storage size, page cache fit and feed latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA page_size')
+            page_size = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_count')
+            db_bytes = cursor.fetchone()[0] * page_size
+            cursor.execute('PRAGMA cache_size')
+            cache_size = cursor.fetchone()[0]
+            cursor.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(CAST(text AS BLOB)) '
+                '+ LENGTH(CAST(text_html AS BLOB)) '
+                '+ COALESCE(LENGTH(body_packed), 0)), 0) FROM posts_post'
+            )
+            rows, body_bytes = cursor.fetchone()
+        cache_bytes = (
+            -cache_size * 1024 if cache_size < 0 else cache_size * page_size
+        )
+        self.stdout.write(f'database: {db_bytes / 2 ** 20:.1f} MiB')
+        self.stdout.write(
+            f'post bodies: {body_bytes / 2 ** 20:.1f} MiB in {rows} rows'
+        )
+        if body_bytes:
+            self.stdout.write(
+                'page cache holds '
+                f'{min(1, cache_bytes / body_bytes):.0%} of post bodies'
+            )
+        client = Client()
+        self.report('index, cold', client, reverse('posts:index'),
+                    options['repeat'], cold=True)
+        self.report('index, warm', client, reverse('posts:index'),
+                    options['repeat'])
+        post = Post.objects.only('pk').order_by('?').first()
+        if post is not None:
+            self.report(
+                'post_detail', client,
+                reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+                options['repeat'],
+            )
+
+    def report(self, name, client, url, repeat, cold=False):
+        timings = []
+        for _ in range(repeat):
+            if cold:
+                cache.clear()
+            start = time.perf_counter()
+            client.get(url)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        self.stdout.write(
+            f'{name}: median {timings[len(timings) // 2] * 1000:.1f} ms'
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts import sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Write the sitemap chunks that changed since the last build'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Rewrite every chunk, changed or not',
+        )
+
+    def handle(self, *args, **options):
+        written, total = sitemaps.build(force=options['all'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Done, {written} sitemap chunks written, {total} listed'
+        ))
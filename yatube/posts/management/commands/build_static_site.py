@@ -0,0 +1,30 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import static_site
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the public pages into a static directory tree'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=settings.POSTS_STATIC_SITE_ROOT,
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Render every page, changed or not',
+        )
+
+    def handle(self, *args, **options):
+        rendered, total = static_site.build(
+            options['output'], options['workers'], force=options['all']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Done, {rendered} of {total} pages rendered'
+        ))
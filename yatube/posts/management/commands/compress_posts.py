@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.db.models.functions import Length
+
+from posts.compression import pack_instance
+from posts.models import ArchivedPost, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Pack or unpack post bodies in batches to match '
+        'POSTS_COMPRESS_BODY and POSTS_COMPRESS_MIN_LENGTH'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model in (Post, ArchivedPost):
+            queryset = model.objects.annotate(
+                text_length=Length('text')
+            ).filter(
+                Q(body_packed__isnull=False)
+                | Q(text_length__gte=settings.POSTS_COMPRESS_MIN_LENGTH)
+            ).order_by('pk').only('text', 'text_html', 'body_packed')
+            last_pk = 0
+            total = 0
+            while True:
+                batch = list(
+                    queryset.filter(pk__gt=last_pk)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                for post in batch:
+                    pack_instance(post)
+                model.objects.bulk_update(
+                    batch, ['text', 'text_html', 'body_packed']
+                )
+                last_pk = batch[-1].pk
+                total += len(batch)
+                self.stdout.write(f'{model.__name__}: {total} converted')
+            self.stdout.write(self.style.SUCCESS(
+                f'{model.__name__}: done, {total} converted'
+            ))
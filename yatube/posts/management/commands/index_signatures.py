@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import duplicates
+from posts.models import Post, PostSignature
+
+
+class Command(BaseCommand):
+    help = 'Fill in the MinHash duplicate index for posts that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.POSTS_DUPLICATE_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-index every post, not only the missing ones',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        last_pk = 0
+        queryset = Post.objects.order_by('pk').only('text', 'body_packed')
+        if not options['all']:
+            queryset = queryset.exclude(
+                pk__in=PostSignature.objects.values('post_id')
+            )
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            total += duplicates.index_batch(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f'{total} indexed')
+        self.stdout.write(self.style.SUCCESS(f'Done, {total} indexed'))
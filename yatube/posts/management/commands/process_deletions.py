@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.deletion import process_batch
+from posts.models import DeletionJob
+
+
+class Command(BaseCommand):
+    help = 'Delete users and groups scheduled for deletion in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.POSTS_DELETION_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Pause between batches, in seconds',
+        )
+
+    def handle(self, *args, **options):
+        jobs = DeletionJob.objects.filter(finished__isnull=True)
+        for job in jobs.order_by('pk'):
+            while process_batch(job, options['batch_size']):
+                self.stdout.write(f'{job}: {job.processed} posts processed')
+                if options['sleep']:
+                    time.sleep(options['sleep'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{job}: done, {job.processed} posts processed'
+            ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import months
+
+
+class Command(BaseCommand):
+    help = 'Recount the monthly post counts behind the archive pages'
+
+    def handle(self, *args, **options):
+        total = months.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done, {total} monthly counts stored'
+        ))
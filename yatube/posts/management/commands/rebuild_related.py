@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import related
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TF-IDF term index and related posts of every post'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.POSTS_RELATED_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        total = related.rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Done, {total} posts indexed'
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.models import Follow
+
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized follow timelines'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='users',
+            help='Rebuild only this user id; may be repeated',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['users'] or Follow.objects.values_list(
+            'user_id', flat=True
+        ).distinct().order_by('user_id')
+        total = 0
+        for user_id in user_ids:
+            timeline.rebuild(user_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Done, {total} timelines rebuilt'
+        ))
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import group_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the post counts and activity of every group'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.POSTS_GROUP_STATS_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        total = group_stats.refresh_all(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Done, {total} groups refreshed'
+        ))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from posts.compression import pack_instance
+from posts.models import RENDERED_FIELDS, ArchivedPost, Post, render_post
+
+
+class Command(BaseCommand):
+    help = 'Fill in pre-rendered HTML for posts that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-render every post, not only the missing ones',
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, ArchivedPost):
+            total = 0
+            last_pk = 0
+            queryset = model.objects.order_by('pk').only(
+                'text', 'body_packed'
+            )
+            if not options['all']:
+                # Packed rows store an empty ``text_html`` by design.
+                queryset = queryset.filter(
+                    Q(text_html='', body_packed__isnull=True)
+                    | Q(preview_html='')
+                )
+            while True:
+                batch = list(
+                    queryset.filter(pk__gt=last_pk)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                for post in batch:
+                    post.text = str(post.text)
+                    render_post(post)
+                    pack_instance(post)
+                model.objects.bulk_update(
+                    batch, RENDERED_FIELDS + ('text', 'body_packed')
+                )
+                last_pk = batch[-1].pk
+                total += len(batch)
+                self.stdout.write(f'{model.__name__}: {total} rendered')
+            self.stdout.write(self.style.SUCCESS(
+                f'{model.__name__}: done, {total} rendered'
+            ))
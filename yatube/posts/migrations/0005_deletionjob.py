@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_archivedpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(choices=[('user', 'Пользователь'), ('group', 'Группа')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('target', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_preview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='body_packed',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='body_packed',
+            field=models.BinaryField(null=True),
+        ),
+    ]
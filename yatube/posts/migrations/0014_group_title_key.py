@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:33
+
+from django.db import migrations, models
+
+
+def fill_title_key(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    # SQLite's LOWER() folds ASCII only, so the keys are built in Python
+    # the same way Group.save() builds them.
+    groups = list(Group.objects.only('title'))
+    for group in groups:
+        group.title_key = group.title.lower()
+    Group.objects.bulk_update(groups, ['title_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='title_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(fill_title_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupStats.objects.bulk_create(
+        GroupStats(group_id=pk)
+        for pk in Group.objects.values_list('pk', flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_monthly_post_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(db_index=True, default=0)),
+                ('recent_count', models.PositiveIntegerField(db_index=True, default=0)),
+                ('last_post_date', models.DateTimeField(db_index=True, null=True)),
+                ('refreshed', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='post',
+            index_together={('group', 'pub_date')},
+        ),
+        migrations.RunPython(create_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Пост'), ('group', 'Сообщество')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('period', models.PositiveIntegerField(db_index=True)),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+                'index_together': {('kind', 'period', 'score')},
+            },
+        ),
+    ]
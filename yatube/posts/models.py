@@ -1,21 +1,73 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.template.defaultfilters import linebreaksbr
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+from .compression import PACKED_FIELDS, PackedBodyMixin, pack_instance
 
 User = get_user_model()
 
+RENDERED_FIELDS = ('text_html', 'preview_html', 'is_truncated')
+
+
+def render_text(text):
+    return linebreaksbr(text, autoescape=True)
+
+
+def render_post(post):
+    preview = Truncator(post.text).chars(settings.POSTS_PREVIEW_CHARS)
+    post.text_html = render_text(post.text)
+    post.preview_html = render_text(preview)
+    post.is_truncated = preview != post.text
+
+
+class RenderedTextMixin:
+    @property
+    def html(self):
+        if self.text_html:
+            return mark_safe(self.text_html)
+        return render_text(self.text)
+
+    @property
+    def preview(self):
+        if self.preview_html:
+            return mark_safe(self.preview_html)
+        return render_text(
+            Truncator(self.text).chars(settings.POSTS_PREVIEW_CHARS)
+        )
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
+    # Lowercased title for prefix range lookups in the group picker.
+    title_key = models.CharField(
+        max_length=200, db_index=True, default='', editable=False
+    )
     slug = models.SlugField(unique=True)
     description = models.TextField()
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.title_key = self.title.lower()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'title' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'title_key'}
+        super().save(*args, **kwargs)
 
-class Post(models.Model):
+
+class Post(PackedBodyMixin, RenderedTextMixin, models.Model):
     text = models.TextField()
-    pub_date = models.DateTimeField(auto_now_add=True)
+    text_html = models.TextField(blank=True, editable=False)
+    body_packed = models.BinaryField(null=True, editable=False)
+    preview_html = models.TextField(blank=True, editable=False)
+    is_truncated = models.BooleanField(default=False, editable=False)
+    pub_date = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -28,9 +80,286 @@ class Post(models.Model):
         on_delete=models.SET_NULL,
         related_name='posts'
     )
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    views = models.PositiveIntegerField(
+        default=0, db_index=True, editable=False
+    )
+    is_flagged = models.BooleanField(default=False, db_index=True)
+
+    is_archived = False
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        self.text = str(self.text)
+        render_post(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(
+                RENDERED_FIELDS) | {'body_packed'}
+        text, html = pack_instance(self)
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self.text, self.text_html = text, html
+
     class Meta:
         ordering = ('-pub_date',)
+        index_together = (('group', 'pub_date'),)
+
+
+class ArchivedPost(PackedBodyMixin, RenderedTextMixin, models.Model):
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    text_html = models.TextField(blank=True, editable=False)
+    body_packed = models.BinaryField(null=True, editable=False)
+    preview_html = models.TextField(blank=True, editable=False)
+    is_truncated = models.BooleanField(default=False, editable=False)
+    pub_date = models.DateTimeField(db_index=True)
+    updated = models.DateTimeField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts'
+    )
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    views = models.PositiveIntegerField(
+        default=0, db_index=True, editable=False
+    )
+    is_flagged = models.BooleanField(default=False, db_index=True)
+
+    is_archived = True
+
+    def __str__(self):
+        return self.text[:15]
+
+    @classmethod
+    def from_post(cls, post):
+        values = {
+            field.attname: getattr(post, field.attname)
+            for field in cls._meta.concrete_fields
+        }
+        if values['body_packed'] is not None:
+            # Packed rows keep the text only in the blob; copying the
+            # unpacked proxies would store it twice.
+            values.update(dict.fromkeys(PACKED_FIELDS, ''))
+        return cls(**values)
+
+    class Meta:
+        ordering = ('-pub_date',)
+
+
+class DeletionJob(models.Model):
+    USER = 'user'
+    GROUP = 'group'
+    TARGETS = (
+        (USER, 'Пользователь'),
+        (GROUP, 'Группа'),
+    )
+
+    target = models.CharField(max_length=10, choices=TARGETS)
+    object_id = models.PositiveIntegerField()
+    processed = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.target} {self.object_id}'
+
+    class Meta:
+        unique_together = ('target', 'object_id')
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following'
+    )
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+    class Meta:
+        unique_together = ('user', 'author')
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        index_together = (('user', 'pub_date', 'post'), ('user', 'author'))
+
+
+class Comment(models.Model):
+    # No constraint: comments stay in place when their post is archived.
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='comments'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    text = models.TextField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.text[:15]
+
+    class Meta:
+        ordering = ('pk',)
+        index_together = (('post', 'id'),)
+
+
+class PostTerm(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    term = models.CharField(max_length=40, db_index=True)
+    weight = models.FloatField()
+
+    class Meta:
+        unique_together = ('post', 'term')
+
+
+class RelatedPost(models.Model):
+    # No constraint on ``post``: neighbours stay when the post is archived.
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='related'
+    )
+    other = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ('-score',)
+        unique_together = ('post', 'other')
+        index_together = (('post', 'score'),)
+
+
+class PostSignature(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+'
+    )
+    minhash = models.BinaryField()
+
+
+class SignatureBucket(models.Model):
+    signature = models.ForeignKey(
+        PostSignature,
+        on_delete=models.CASCADE,
+        related_name='buckets'
+    )
+    key = models.BigIntegerField(db_index=True)
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0, db_index=True)
+    recent_count = models.PositiveIntegerField(default=0, db_index=True)
+    last_post_date = models.DateTimeField(null=True, db_index=True)
+    refreshed = models.DateTimeField(null=True)
+
+
+class TrendingScore(models.Model):
+    POST = 'post'
+    GROUP = 'group'
+    KIND_CHOICES = (
+        (POST, 'Пост'),
+        (GROUP, 'Сообщество'),
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    # Forward-decayed score, relative to the landmark of ``period``.
+    period = models.PositiveIntegerField(db_index=True)
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+        index_together = (('kind', 'period', 'score'),)
+
+
+class MonthlyPostCount(models.Model):
+    # '' for the whole site, 'group:<id>' or 'author:<id>'.
+    scope = models.CharField(max_length=40)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('-year', '-month')
+        unique_together = ('scope', 'year', 'month')
+
+
+def recount_comments(post_ids):
+    for model in (Post, ArchivedPost):
+        model.objects.filter(pk__in=post_ids).update(
+            comments_count=Coalesce(models.Subquery(
+                Comment.objects.filter(
+                    post_id=models.OuterRef('pk')
+                ).order_by().values('post_id').annotate(
+                    count=models.Count('pk')
+                ).values('count')
+            ), 0)
+        )
+
+
+def drop_post_dependents(post_ids):
+    """Delete the unconstrained rows of posts that are gone for good."""
+    post_ids = set(post_ids) - set(ArchivedPost.objects.filter(
+        pk__in=post_ids
+    ).values_list('pk', flat=True))
+    Comment.objects.filter(post_id__in=post_ids).delete()
+    RelatedPost.objects.filter(post_id__in=post_ids).delete()
+    TrendingScore.objects.filter(
+        kind=TrendingScore.POST, object_id__in=post_ids
+    ).delete()
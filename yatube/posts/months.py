@@ -0,0 +1,132 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import ExtractMonth, ExtractYear, Greatest
+from django.utils import timezone
+
+from .archive import ChainedPosts, chained
+from .feeds import SUMMARY_DEFERRED
+from .models import ArchivedPost, MonthlyPostCount, Post
+
+SITE = ''
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def scopes(author_id, group_id):
+    result = [SITE, author_scope(author_id)]
+    if group_id:
+        result.append(group_scope(group_id))
+    return result
+
+
+def month_of(pub_date):
+    local = timezone.localtime(pub_date)
+    return local.year, local.month
+
+
+def month_bounds(year, month):
+    start = timezone.make_aware(datetime(year, month, 1))
+    end = (start.replace(tzinfo=None) + timedelta(days=32)).replace(day=1)
+    return start, timezone.make_aware(end)
+
+
+def add(counts):
+    """Apply ``{(scope, year, month): delta}`` to the stored counts."""
+    for (scope, year, month), delta in counts.items():
+        if not delta:
+            continue
+        rows = MonthlyPostCount.objects.filter(
+            scope=scope, year=year, month=month
+        )
+        # Posts bulk-created without signals are not counted until the
+        # next rebuild, so removing them must not drive a count negative.
+        if rows.update(count=Greatest(F('count') + delta, 0)) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                MonthlyPostCount.objects.create(
+                    scope=scope, year=year, month=month, count=delta
+                )
+        except IntegrityError:
+            rows.update(count=F('count') + delta)
+
+
+def add_post(post, delta):
+    year, month = month_of(post.pub_date)
+    add({
+        (scope, year, month): delta
+        for scope in scopes(post.author_id, post.group_id)
+    })
+
+
+def regroup_post(post, old_group_id):
+    year, month = month_of(post.pub_date)
+    counts = Counter()
+    if old_group_id:
+        counts[(group_scope(old_group_id), year, month)] -= 1
+    if post.group_id:
+        counts[(group_scope(post.group_id), year, month)] += 1
+    add(counts)
+
+
+def _months(queryset, *fields):
+    return queryset.order_by().annotate(
+        year=ExtractYear('pub_date'), month=ExtractMonth('pub_date')
+    ).values(*fields, 'year', 'month').annotate(count=Count('pk'))
+
+
+def tally(queryset, sign=1):
+    """Per scope and month counts of ``queryset``, as ``add`` takes them."""
+    counts = Counter()
+    for row in _months(queryset, 'author_id', 'group_id'):
+        for scope in scopes(row['author_id'], row['group_id']):
+            counts[(scope, row['year'], row['month'])] += sign * row['count']
+    return counts
+
+
+def regroup(queryset, group_id):
+    """Count changes for moving the posts of ``queryset`` to a group."""
+    counts = Counter()
+    for row in _months(queryset, 'group_id'):
+        month = (row['year'], row['month'])
+        if row['group_id']:
+            counts[(group_scope(row['group_id']), *month)] -= row['count']
+        if group_id:
+            counts[(group_scope(group_id), *month)] += row['count']
+    return counts
+
+
+def rebuild():
+    counts = Counter()
+    for model in (Post, ArchivedPost):
+        counts.update(tally(model.objects.all()))
+    with transaction.atomic():
+        MonthlyPostCount.objects.all().delete()
+        MonthlyPostCount.objects.bulk_create(
+            MonthlyPostCount(scope=scope, year=year, month=month, count=n)
+            for (scope, year, month), n in counts.items()
+        )
+    return len(counts)
+
+
+def navigation(scope):
+    return list(MonthlyPostCount.objects.filter(scope=scope, count__gt=0))
+
+
+def month_posts(year, month, total, **filters):
+    """Posts of one month, newest first, as a range on ``pub_date``."""
+    start, end = month_bounds(year, month)
+    posts = chained(pub_date__gte=start, pub_date__lt=end, **filters)
+    return ChainedPosts(*(
+        queryset.select_related('author', 'group').defer(*SUMMARY_DEFERRED)
+        for queryset in (posts.hot, posts.cold)
+    ), total=total)
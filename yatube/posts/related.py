@@ -0,0 +1,190 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .feeds import SUMMARY_DEFERRED
+from .models import Post, PostTerm, RelatedPost
+
+TOKEN_RE = re.compile(r'[^\W\d_]{3,}')
+TERM_LENGTH = PostTerm._meta.get_field('term').max_length
+
+
+def tokenize(text):
+    return [
+        token[:TERM_LENGTH] for token in TOKEN_RE.findall(str(text).lower())
+    ]
+
+
+def weigh(tf, df, total):
+    """Return the L2-normalised TF-IDF vector of a document as a dict."""
+    vector = {
+        term: (1 + math.log(count))
+        * (math.log((1 + total) / (1 + df[term])) + 1)
+        for term, count in tf.items()
+    }
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()}
+
+
+def neighbours(vector, postings, exclude):
+    """Top neighbours of ``vector`` by cosine similarity.
+
+    ``postings`` maps a term to the ``(post_id, weight)`` pairs of the
+    posts containing it, so the scores are the sparse dot products of
+    ``vector`` with every post sharing at least one term with it.
+    """
+    scores = defaultdict(float)
+    for term, weight in vector.items():
+        for post_id, other_weight in postings.get(term, ()):
+            scores[post_id] += weight * other_weight
+    scores.pop(exclude, None)
+    return heapq.nlargest(
+        settings.POSTS_RELATED_COUNT, scores.items(), key=itemgetter(1)
+    )
+
+
+def _rows(post_id, pairs):
+    return [
+        RelatedPost(post_id=post_id, other_id=other_id, score=score)
+        for other_id, score in pairs
+    ]
+
+
+def _texts(batch_size, top):
+    """Yield the ``(pk, text)`` pairs of posts up to ``top``, in batches."""
+    last_pk = 0
+    queryset = Post.objects.order_by('pk').only('text', 'body_packed')
+    while True:
+        batch = list(queryset.filter(
+            pk__gt=last_pk, pk__lte=top
+        )[:batch_size])
+        if not batch:
+            return
+        yield [(post.pk, post.text) for post in batch]
+        last_pk = batch[-1].pk
+
+
+def _vectors(batch, df, total):
+    for post_id, text in batch:
+        tf = Counter(tokenize(text))
+        if tf:
+            yield post_id, weigh(tf, df, total)
+
+
+def _replace(after, upto, terms, rows):
+    """Swap in the index rows of the posts with ``after < pk <= upto``."""
+    span = {'post_id__gt': after, 'post_id__lte': upto}
+    with transaction.atomic():
+        PostTerm.objects.filter(**span).delete()
+        RelatedPost.objects.filter(**span).delete()
+        PostTerm.objects.bulk_create(terms)
+        RelatedPost.objects.bulk_create(rows)
+
+
+def rebuild(batch_size):
+    """Recompute the term index and neighbour lists of every post.
+
+    The posts are read three times, a batch at a time: for the document
+    frequencies, for the postings and for the neighbours. Only the
+    postings of terms shared by several posts are kept in memory. The
+    rows of each batch are swapped in by a short transaction of their
+    own, so writers are not blocked while the neighbours are computed
+    and readers never see an empty index.
+    """
+    top = Post.objects.aggregate(top=Max('pk'))['top'] or 0
+    df = Counter()
+    total = 0
+    for batch in _texts(batch_size, top):
+        total += len(batch)
+        for _, text in batch:
+            df.update(set(tokenize(text)))
+    postings = defaultdict(list)
+    for batch in _texts(batch_size, top):
+        for post_id, vector in _vectors(batch, df, total):
+            for term, weight in vector.items():
+                # A term of a single post scores no neighbour.
+                if 1 < df[term] <= settings.POSTS_RELATED_MAX_POSTINGS:
+                    postings[term].append((post_id, weight))
+    indexed = last_pk = 0
+    for batch in _texts(batch_size, top):
+        terms, rows = [], []
+        for post_id, vector in _vectors(batch, df, total):
+            terms.extend(
+                PostTerm(post_id=post_id, term=term, weight=weight)
+                for term, weight in vector.items()
+            )
+            rows.extend(_rows(
+                post_id, neighbours(vector, postings, post_id)
+            ))
+            indexed += 1
+        _replace(last_pk, batch[-1][0], terms, rows)
+        last_pk = batch[-1][0]
+    _replace(last_pk, top, [], [])
+    return indexed
+
+
+def _offer(post_id, pairs):
+    """Let the new neighbours of a post list it among their own."""
+    current = defaultdict(list)
+    for row in RelatedPost.objects.filter(
+        post_id__in=[other_id for other_id, _ in pairs]
+    ).values_list('post_id', 'other_id', 'score'):
+        current[row[0]].append(row[1:])
+    for other_id, score in pairs:
+        kept = [pair for pair in current[other_id] if pair[0] != post_id]
+        best = heapq.nlargest(
+            settings.POSTS_RELATED_COUNT,
+            kept + [(post_id, score)],
+            key=itemgetter(1),
+        )
+        if best != current[other_id]:
+            RelatedPost.objects.filter(post_id=other_id).delete()
+            RelatedPost.objects.bulk_create(_rows(other_id, best))
+
+
+@transaction.atomic
+def update(post):
+    """Index a new or edited post and refresh the neighbours around it.
+
+    Document frequencies are read from the stored index, so the weights
+    drift slowly from what ``rebuild`` would produce until it runs again.
+    """
+    tf = Counter(tokenize(post.text))
+    PostTerm.objects.filter(post_id=post.pk).delete()
+    RelatedPost.objects.filter(post_id=post.pk).delete()
+    if not tf:
+        return
+    df = Counter(dict(
+        PostTerm.objects.filter(term__in=tf).order_by()
+        .values('term').annotate(count=Count('pk'))
+        .values_list('term', 'count')
+    ))
+    df.update(tf.keys())
+    vector = weigh(tf, df, Post.objects.count())
+    PostTerm.objects.bulk_create(
+        PostTerm(post_id=post.pk, term=term, weight=weight)
+        for term, weight in vector.items()
+    )
+    postings = defaultdict(list)
+    for post_id, term, weight in PostTerm.objects.filter(term__in=[
+        term for term in vector
+        if df[term] <= settings.POSTS_RELATED_MAX_POSTINGS
+    ]).exclude(post_id=post.pk).values_list('post_id', 'term', 'weight'):
+        postings[term].append((post_id, weight))
+    pairs = neighbours(vector, postings, post.pk)
+    RelatedPost.objects.bulk_create(_rows(post.pk, pairs))
+    _offer(post.pk, pairs)
+
+
+def related_posts(post):
+    return RelatedPost.objects.filter(post_id=post.pk).select_related(
+        'other__author'
+    ).defer(
+        *(f'other__{field}' for field in SUMMARY_DEFERRED)
+    )[:settings.POSTS_RELATED_COUNT]
@@ -0,0 +1,167 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.cache import MISSING, cache
+
+from . import duplicates, group_stats, months, trending
+from .lookups import group_key, user_key
+from .models import (
+    ArchivedPost, Comment, DeletionJob, Group, GroupStats, MonthlyPostCount,
+    Post, RelatedPost, TrendingScore, drop_post_dependents
+)
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._initial_group_id = instance.__dict__.get('group_id')
+
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, created, **kwargs):
+    # Connected before invalidate_post_feeds, which resets the group.
+    if created:
+        months.add_post(instance, 1)
+        group_stats.add_post(instance, 1)
+        if instance.group_id:
+            trending.record(TrendingScore.GROUP, instance.group_id, 'post')
+    elif instance.group_id != instance._initial_group_id:
+        months.regroup_post(instance, instance._initial_group_id)
+        group_stats.regroup_post(instance, instance._initial_group_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    tags = {'feed', f'author:{instance.author_id}'}
+    for group_id in (instance.group_id, instance._initial_group_id):
+        if group_id:
+            tags.add(f'group:{group_id}')
+    cache.invalidate_tags(*tags)
+    instance._initial_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+def index_signature(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and 'text' not in update_fields:
+        return
+    values = instance.__dict__.pop('_minhash', MISSING)
+    if values is MISSING:
+        values = duplicates.signature(instance.text)
+    duplicates.index(instance, values)
+
+
+@receiver(post_init, sender=Group)
+def remember_slug(sender, instance, **kwargs):
+    instance._initial_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Group)
+def create_group_stats(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.create(group=instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_lookup(sender, instance, **kwargs):
+    cache.invalidate_tags(
+        group_key(instance.slug), group_key(instance._initial_slug)
+    )
+    instance._initial_slug = instance.slug
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._initial_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_lookup(sender, instance, **kwargs):
+    cache.invalidate_tags(
+        user_key(instance.username), user_key(instance._initial_username)
+    )
+    instance._initial_username = instance.username
+
+
+@receiver(post_save, sender=DeletionJob)
+def invalidate_deleted(sender, instance, created, **kwargs):
+    cache.invalidate_tags('posts')
+    if not created:
+        return
+    if instance.target == DeletionJob.USER:
+        cache.invalidate_tags(*(
+            user_key(username) for username in User.objects.filter(
+                pk=instance.object_id).values_list('username', flat=True)
+        ))
+    else:
+        cache.invalidate_tags(*(
+            group_key(slug) for slug in Group.objects.filter(
+                pk=instance.object_id).values_list('slug', flat=True)
+        ))
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    if not created:
+        return
+    trending.record(TrendingScore.POST, instance.post_id, 'comment')
+    updated = Post.objects.filter(pk=instance.post_id).update(
+        comments_count=F('comments_count') + 1
+    )
+    if not updated:
+        ArchivedPost.objects.filter(pk=instance.post_id).update(
+            comments_count=F('comments_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Post)
+def delete_dependents(sender, instance, **kwargs):
+    drop_post_dependents([instance.pk])
+
+
+@receiver(post_delete, sender=ArchivedPost)
+def delete_archived_dependents(sender, instance, **kwargs):
+    Comment.objects.filter(post_id=instance.pk).delete()
+    RelatedPost.objects.filter(post_id=instance.pk).delete()
+    TrendingScore.objects.filter(
+        kind=TrendingScore.POST, object_id=instance.pk
+    ).delete()
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    if not ArchivedPost.objects.filter(pk=instance.pk).exists():
+        months.add_post(instance, -1)
+        group_stats.add_post(instance, -1)
+
+
+@receiver(post_delete, sender=ArchivedPost)
+def uncount_archived_post(sender, instance, **kwargs):
+    months.add_post(instance, -1)
+    group_stats.add_post(instance, -1)
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_months(sender, instance, **kwargs):
+    MonthlyPostCount.objects.filter(
+        scope=months.group_scope(instance.pk)
+    ).delete()
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_score(sender, instance, **kwargs):
+    TrendingScore.objects.filter(
+        kind=TrendingScore.GROUP, object_id=instance.pk
+    ).delete()
+
+
+@receiver(post_delete, sender=User)
+def drop_author_months(sender, instance, **kwargs):
+    MonthlyPostCount.objects.filter(
+        scope=months.author_scope(instance.pk)
+    ).delete()
@@ -0,0 +1,241 @@
+import hashlib
+import heapq
+import json
+import os
+from operator import itemgetter
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Max, Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from .deletion import pending
+from .models import ArchivedPost, DeletionJob, Group, Post
+
+User = get_user_model()
+
+MANIFEST = 'sitemaps.json'
+INDEX = 'sitemap.xml'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class Section:
+    """URLs of one kind, split into chunks by fixed primary key ranges.
+
+    Chunk ``n`` holds the rows with ``n * size <= pk < (n + 1) * size``,
+    so a new row only ever lands in the last chunk and the others keep
+    their contents until their own rows change.
+    """
+
+    name = None
+    models = ()
+
+    def querysets(self):
+        raise NotImplementedError
+
+    def location(self, row):
+        raise NotImplementedError
+
+    def lastmod(self, row):
+        return None
+
+    def max_pk(self):
+        return max(
+            model.objects.aggregate(pk=Max('pk'))['pk'] or 0
+            for model in self.models
+        )
+
+    def _keyset(self, queryset, lo, hi):
+        queryset = queryset.filter(pk__gte=lo, pk__lt=hi).order_by('pk')
+        last_pk = lo - 1
+        while True:
+            batch = list(queryset.filter(
+                pk__gt=last_pk
+            )[:settings.POSTS_SITEMAP_BATCH_SIZE])
+            yield from batch
+            if len(batch) < settings.POSTS_SITEMAP_BATCH_SIZE:
+                return
+            last_pk = batch[-1][0]
+
+    def rows(self, lo, hi):
+        return heapq.merge(*(
+            self._keyset(queryset, lo, hi) for queryset in self.querysets()
+        ), key=itemgetter(0))
+
+    def fingerprint(self, lo, hi):
+        # Narrow tables: hashing the rows themselves is cheap enough and
+        # also catches renamed usernames and slugs.
+        digest = hashlib.sha1()
+        for row in self.rows(lo, hi):
+            digest.update(repr(row).encode())
+        return digest.hexdigest()
+
+
+class PostSection(Section):
+    name = 'posts'
+    models = (Post, ArchivedPost)
+
+    def querysets(self):
+        hidden = pending(DeletionJob.USER)
+        return [
+            model.objects.exclude(author__in=hidden).values_list(
+                'pk', 'updated'
+            )
+            for model in self.models
+        ]
+
+    def location(self, row):
+        return reverse('posts:post_detail', args=(row[0],))
+
+    def lastmod(self, row):
+        return row[1]
+
+    def fingerprint(self, lo, hi):
+        # Aggregates over the pk range instead of reading every row:
+        # any edit moves ``updated``, any insert or delete the count and
+        # the sum of the keys.
+        return repr([
+            queryset.filter(pk__gte=lo, pk__lt=hi).aggregate(
+                count=Count('pk'), updated=Max('updated'), keys=Sum('pk')
+            )
+            for queryset in self.querysets()
+        ])
+
+
+class ProfileSection(Section):
+    name = 'profiles'
+    models = (User,)
+
+    def querysets(self):
+        return [User.objects.filter(is_active=True).exclude(
+            pk__in=pending(DeletionJob.USER)
+        ).values_list('pk', 'username')]
+
+    def location(self, row):
+        return reverse('posts:profile', args=(row[1],))
+
+
+class GroupSection(Section):
+    name = 'groups'
+    models = (Group,)
+
+    def querysets(self):
+        return [Group.objects.exclude(
+            pk__in=pending(DeletionJob.GROUP)
+        ).values_list('pk', 'slug')]
+
+    def location(self, row):
+        return reverse('posts:group_list', args=(row[1],))
+
+
+SECTIONS = (PostSection(), ProfileSection(), GroupSection())
+
+
+def path(name):
+    return os.path.join(settings.POSTS_SITEMAP_ROOT, name)
+
+
+def _write(name, lines):
+    target = path(name)
+    with open(f'{target}.tmp', 'w', encoding='utf-8') as output:
+        output.writelines(lines)
+    os.replace(f'{target}.tmp', target)
+
+
+def _w3c(value):
+    return value.isoformat(timespec='seconds')
+
+
+def _entry(tag, location, lastmod):
+    entry = f'<{tag}><loc>{escape(location)}</loc>'
+    if lastmod is not None:
+        entry += f'<lastmod>{lastmod}</lastmod>'
+    return f'{entry}</{tag}>\n'
+
+
+def _chunk_lines(section, rows, state):
+    yield (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<urlset xmlns="{XMLNS}">\n'
+    )
+    for row in rows:
+        lastmod = section.lastmod(row)
+        if lastmod is not None:
+            state['lastmod'] = max(state['lastmod'] or lastmod, lastmod)
+        state['count'] += 1
+        yield _entry(
+            'url',
+            settings.POSTS_SITEMAP_BASE_URL + section.location(row),
+            lastmod and _w3c(lastmod),
+        )
+    yield '</urlset>\n'
+
+
+def _index_lines(manifest, names):
+    yield (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<sitemapindex xmlns="{XMLNS}">\n'
+    )
+    for name in names:
+        yield _entry(
+            'sitemap',
+            settings.POSTS_SITEMAP_BASE_URL + reverse(
+                'posts:sitemap_chunk', args=(name[:-len('.xml')],)
+            ),
+            manifest[name]['lastmod'],
+        )
+    yield '</sitemapindex>\n'
+
+
+def _load_manifest():
+    try:
+        with open(path(MANIFEST), encoding='utf-8') as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+def build(force=False):
+    """Write the sitemap chunks whose rows changed, then the index.
+
+    Each chunk is streamed to disk while its rows are read in keyset
+    batches, and its fingerprint is kept in a manifest next to it; a
+    chunk whose fingerprint did not change since the last build is not
+    read again. Return the numbers of chunks written and listed.
+    """
+    os.makedirs(settings.POSTS_SITEMAP_ROOT, exist_ok=True)
+    old = _load_manifest()
+    manifest = {}
+    written = 0
+    size = settings.POSTS_SITEMAP_CHUNK_SIZE
+    for section in SECTIONS:
+        for number in range(section.max_pk() // size + 1):
+            name = f'{section.name}-{number}.xml'
+            lo, hi = number * size, (number + 1) * size
+            fingerprint = section.fingerprint(lo, hi)
+            entry = old.get(name)
+            if (
+                force or entry is None
+                or entry['fingerprint'] != fingerprint
+                or entry['count'] and not os.path.exists(path(name))
+            ):
+                state = {'count': 0, 'lastmod': None}
+                _write(name, _chunk_lines(
+                    section, section.rows(lo, hi), state
+                ))
+                entry = {
+                    'fingerprint': fingerprint,
+                    'count': state['count'],
+                    'lastmod': _w3c(state['lastmod'] or timezone.now()),
+                }
+                written += 1
+            manifest[name] = entry
+    listed = [name for name, entry in manifest.items() if entry['count']]
+    _write(INDEX, _index_lines(manifest, listed))
+    _write(MANIFEST, [json.dumps(manifest, indent=2)])
+    for name in set(old) | set(manifest):
+        if name not in listed and os.path.exists(path(name)):
+            os.remove(path(name))
+    return written, len(listed)
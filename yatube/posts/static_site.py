@@ -0,0 +1,259 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+from collections import Counter, defaultdict
+from itertools import chain, islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from . import trending
+from .archive import chained
+from .deletion import pending
+from .models import ArchivedPost, DeletionJob, Group, Post, RelatedPost
+
+User = get_user_model()
+
+# WSGI environ key marking requests made by the export. Unlike headers,
+# which arrive as ``HTTP_*``, it cannot be sent by an outside client.
+PRERENDER = 'yatube.prerender'
+MANIFEST = 'manifest.json'
+PER_PAGE = 10
+PAGE_LINK_RE = re.compile(r'href="\?page=(\d+)"')
+# Besides the post itself, a listed post shows its author and group.
+ROW_FIELDS = (
+    'pk', 'updated', 'comments_count', 'author__username',
+    'author__first_name', 'author__last_name', 'group__title', 'group__slug',
+)
+
+_client = None
+
+
+def page_url(path, page):
+    return path if page == 1 else f'{path}page/{page}/'
+
+
+def _target(root, url):
+    return os.path.join(root, url.lstrip('/'), 'index.html')
+
+
+def _digest(value):
+    return hashlib.sha1(repr(value).encode()).hexdigest()
+
+
+def _templates_digest():
+    digest = hashlib.sha1()
+    for directory, dirs, files in sorted(os.walk(settings.TEMPLATES_DIR)):
+        for name in sorted(files):
+            with open(os.path.join(directory, name), 'rb') as template:
+                digest.update(template.read())
+    return digest.hexdigest()
+
+
+def _listing(path, posts, extra):
+    """Pages of a feed as ``(path, page, inputs)``, read as a stream."""
+    rows = chain.from_iterable(
+        queryset.values_list(*ROW_FIELDS).iterator()
+        for queryset in (posts.hot, posts.cold)
+    )
+    page = 1
+    while True:
+        batch = list(islice(rows, PER_PAGE))
+        if not batch and page > 1:
+            return
+        yield path, page, (extra, batch)
+        if len(batch) < PER_PAGE:
+            return
+        page += 1
+
+
+def _posts_counts():
+    counts = Counter()
+    for model in (Post, ArchivedPost):
+        counts.update(dict(
+            model.objects.order_by().values_list('author_id').annotate(
+                Count('pk')
+            )
+        ))
+    return counts
+
+
+def _related():
+    """Ids and edit times of the neighbours shown on each post page."""
+    related = defaultdict(list)
+    for post_id, other_id, updated in RelatedPost.objects.order_by(
+        'post_id', '-score'
+    ).values_list('post_id', 'other_id', 'other__updated').iterator():
+        if len(related[post_id]) < settings.POSTS_RELATED_COUNT:
+            related[post_id].append((other_id, updated))
+    return related
+
+
+def pages():
+    """Every exported page with the data its rendering depends on."""
+    hidden = pending(DeletionJob.USER)
+    posts_counts = _posts_counts()
+    yield from _listing(reverse('posts:index'), chained(), (
+        [post.pk for post in trending.trending_posts()],
+        [group.pk for group in trending.trending_groups()],
+    ))
+    for group in Group.objects.exclude(
+        pk__in=pending(DeletionJob.GROUP)
+    ).order_by('pk').iterator():
+        yield from _listing(
+            reverse('posts:group_list', args=(group.slug,)),
+            chained(group_id=group.pk),
+            (group.title, group.description),
+        )
+    for user in User.objects.filter(is_active=True).exclude(
+        pk__in=hidden
+    ).order_by('pk').iterator():
+        yield from _listing(
+            reverse('posts:profile', args=(user.username,)),
+            chained(author_id=user.pk),
+            (user.username, user.get_full_name(), posts_counts[user.pk]),
+        )
+    related = _related()
+    for model in (Post, ArchivedPost):
+        for row in model.objects.exclude(author__in=hidden).order_by(
+            'pk'
+        ).values_list(*ROW_FIELDS, 'views', 'author_id').iterator():
+            yield reverse('posts:post_detail', args=(row[0],)), 1, (
+                row, posts_counts[row[-1]], related.get(row[0], []),
+            )
+    for name in ('about:author', 'about:tech'):
+        yield reverse(name), 1, None
+
+
+def _relink(html, path):
+    """Point ``?page=N`` links at the exported ``page/N/`` directories."""
+    return PAGE_LINK_RE.sub(
+        lambda match: f'href="{page_url(path, int(match.group(1)))}"', html
+    )
+
+
+def _init_worker():
+    global _client
+    _client = Client(**{PRERENDER: True})
+
+
+def render(job):
+    """Render one page to its file; return its URL and whether it did."""
+    root, path, page = job
+    if _client is None:
+        _init_worker()
+    url = page_url(path, page)
+    response = _client.get(path, {'page': page} if page > 1 else {})
+    if response.status_code != 200:
+        return url, False
+    target = _target(root, url)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(f'{target}.tmp', 'w', encoding='utf-8') as output:
+        output.write(_relink(response.content.decode(), path))
+    os.replace(f'{target}.tmp', target)
+    return url, True
+
+
+def _static_files():
+    """``(name, path)`` of the static files the pages link to.
+
+    Once ``collectstatic`` has written a manifest the pages use the
+    hashed names found in ``STATIC_ROOT``; until then, the source files.
+    """
+    if staticfiles_storage.hashed_files:
+        for directory, dirs, files in os.walk(settings.STATIC_ROOT):
+            for name in files:
+                path = os.path.join(directory, name)
+                yield os.path.relpath(path, settings.STATIC_ROOT), path
+        return
+    for finder in finders.get_finders():
+        for name, storage in finder.list(['CVS', '.*', '*~']):
+            yield name, storage.path(name)
+
+
+def _copy_static(root):
+    """Copy the static files that changed since the last build."""
+    static_root = os.path.join(root, settings.STATIC_URL.strip('/'))
+    for name, source in _static_files():
+        target = os.path.join(static_root, name)
+        stat = os.stat(source)
+        if os.path.exists(target):
+            current = os.stat(target)
+            if (current.st_size, current.st_mtime_ns) == (
+                stat.st_size, stat.st_mtime_ns
+            ):
+                continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(source, target)
+
+
+def _load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST), encoding='utf-8') as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+def _render_all(jobs, workers):
+    if workers <= 1 or len(jobs) <= 1:
+        return map(render, jobs)
+    # Forked workers inherit the configured project; connections are
+    # closed first so that no child reuses the parent's socket.
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    with context.Pool(workers, initializer=_init_worker) as pool:
+        return list(pool.imap_unordered(render, jobs, chunksize=16))
+
+
+def build(root, workers, force=False):
+    """Render the pages whose inputs changed since the last build.
+
+    The inputs of a page are the rows it lists plus the templates and
+    the current month shown in the header; their digest is kept in the
+    manifest, so unchanged pages are neither rendered nor rewritten.
+    The static files are copied alongside, so the tree can be served
+    as it is. Return the numbers of pages rendered and exported.
+    """
+    old = _load_manifest(root)
+    shared = (_templates_digest(), timezone.localtime().strftime('%Y-%m'))
+    manifest = {}
+    jobs = []
+    for path, page, inputs in pages():
+        url = page_url(path, page)
+        fingerprint = _digest((shared, inputs))
+        manifest[url] = {
+            'file': os.path.relpath(_target(root, url), root),
+            'fingerprint': fingerprint,
+        }
+        entry = old.get(url)
+        if (
+            force or entry is None
+            or entry['fingerprint'] != fingerprint
+            or not os.path.exists(_target(root, url))
+        ):
+            jobs.append((root, path, page))
+    rendered = 0
+    for url, ok in _render_all(jobs, workers):
+        if ok:
+            rendered += 1
+        else:
+            del manifest[url]
+    for url in set(old) - set(manifest):
+        if os.path.exists(_target(root, url)):
+            os.remove(_target(root, url))
+    os.makedirs(root, exist_ok=True)
+    _copy_static(root)
+    with open(os.path.join(root, MANIFEST), 'w', encoding='utf-8') as output:
+        json.dump(manifest, output, indent=2, sort_keys=True)
+    return rendered, len(manifest)
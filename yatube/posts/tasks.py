@@ -0,0 +1,42 @@
+from django.conf import settings
+
+from core.tasks import enqueue, handler
+
+from . import related, timeline
+from .deletion import process_batch
+from .models import DeletionJob, Post
+
+
+@handler('posts.process_deletion', batch_size=1)
+def process_deletion(payloads):
+    for payload in payloads:
+        job = DeletionJob.objects.filter(
+            pk=payload['job_id'], finished__isnull=True
+        ).first()
+        if job and process_batch(job, settings.POSTS_DELETION_BATCH_SIZE):
+            enqueue('posts.process_deletion', job_id=job.pk)
+
+
+@handler('posts.post_created')
+def post_created(payloads):
+    posts = Post.objects.only(
+        'author_id', 'pub_date', 'text', 'body_packed'
+    ).in_bulk([payload['post_id'] for payload in payloads])
+    for post in posts.values():
+        timeline.fan_out(post)
+        related.update(post)
+
+
+@handler('posts.post_edited')
+def post_edited(payloads):
+    posts = Post.objects.only('text', 'body_packed').in_bulk(
+        [payload['post_id'] for payload in payloads]
+    )
+    for post in posts.values():
+        related.update(post)
+
+
+@handler('posts.follow')
+def follow(payloads):
+    for payload in payloads:
+        timeline.backfill(payload['user_id'], payload['author_id'])
@@ -0,0 +1,160 @@
+from datetime import datetime
+
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import cache
+from core.paginator import estimate_count
+
+from ..feeds import group_feed, index_feed
+from ..models import Comment, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        Post.objects.bulk_create(
+            Post(author=cls.admin, text=f'Пост {i}') for i in range(105)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def test_keyset_pages(self):
+        """Список постов листается по ключу, без OFFSET"""
+        response = self.client.get(self.url)
+        cl = response.context['cl']
+        self.assertTrue(cl.keyset)
+        self.assertEqual(cl.result_count, 105)
+        self.assertFalse(cl.count_estimated)
+        self.assertEqual(len(cl.result_list), 100)
+        self.assertIsNone(cl.first_url)
+        response = self.client.get(self.url + cl.next_url)
+        cl = response.context['cl']
+        self.assertEqual(
+            [post.text for post in cl.result_list],
+            [f'Пост {i}' for i in range(4, -1, -1)],
+        )
+        self.assertIsNone(cl.next_url)
+        self.assertIsNotNone(cl.first_url)
+        response = self.client.get(self.url + cl.first_url)
+        cl = response.context['cl']
+        self.assertEqual(len(cl.result_list), 100)
+        self.assertEqual(cl.result_list[0].text, 'Пост 104')
+        self.assertIsNone(cl.first_url)
+        self.assertIsNotNone(cl.next_url)
+
+    def test_custom_ordering_uses_pages(self):
+        """При другой сортировке остаются номера страниц"""
+        response = self.client.get(self.url, {'o': '1'})
+        self.assertFalse(response.context['cl'].keyset)
+        self.assertEqual(len(response.context['cl'].result_list), 100)
+
+    @override_settings(ADMIN_COUNT_LIMIT=50)
+    def test_count_capped(self):
+        """Подсчёт строк ограничен сверху"""
+        response = self.client.get(self.url, {'q': 'Пост'})
+        cl = response.context['cl']
+        self.assertEqual(cl.result_count, 51)
+        self.assertTrue(cl.count_estimated)
+        self.assertContains(response, 'около 51')
+
+    def test_estimate_from_statistics(self):
+        """Оценка числа строк берётся из статистики базы"""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimate_count(Post), 105)
+
+    def test_date_hierarchy_from_bounds(self):
+        """Годы в иерархии дат строятся по крайним датам"""
+        Post.objects.filter(text='Пост 0').update(
+            pub_date=timezone.make_aware(datetime(2019, 5, 1)))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        for year in range(2019, timezone.now().year + 1):
+            self.assertContains(response, f'pub_date__year={year}')
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertFalse([q for q in sql if 'MIN(' in q or 'MAX(' in q])
+        self.assertEqual(len([q for q in sql if q.endswith('LIMIT 100')]), 1)
+
+
+class PostBulkActionsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        cls.old = Group.objects.create(
+            title='Старая', slug='old', description='-')
+        cls.new = Group.objects.create(
+            title='Новая', slug='new', description='-')
+        Post.objects.bulk_create(
+            Post(author=cls.admin, text=f'Пост {i}', group=cls.old)
+            for i in range(30)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def act(self, action, **data):
+        return self.client.post(self.url, {
+            'action': action,
+            'select_across': '1',
+            'index': '0',
+            helpers.ACTION_CHECKBOX_NAME: [Post.objects.first().pk],
+            **data,
+        })
+
+    @override_settings(POSTS_BULK_CHUNK_SIZE=7)
+    def test_move_and_clear_group(self):
+        """Посты переносятся между группами пакетами"""
+        self.assertEqual(group_feed(self.old).count(), 30)
+        self.act('move_to_group_action', group=self.new.pk)
+        self.assertEqual(Post.objects.filter(group=self.new).count(), 30)
+        self.assertEqual(group_feed(self.old).count(), 0)
+        self.assertEqual(group_feed(self.new).count(), 30)
+        self.act('clear_group_action')
+        self.assertEqual(Post.objects.filter(group=None).count(), 30)
+        self.assertEqual(group_feed(self.new).count(), 0)
+
+    def test_move_requires_group(self):
+        """Без выбранной группы посты не переносятся"""
+        self.act('move_to_group_action')
+        self.assertEqual(Post.objects.filter(group=self.old).count(), 30)
+
+    @override_settings(POSTS_BULK_CHUNK_SIZE=7)
+    def test_delete_with_dependents(self):
+        """Удаление пакетами убирает посты и связанные данные"""
+        post = Post.objects.first()
+        Comment.objects.create(post=post, author=self.admin, text='К')
+        TimelineEntry.objects.create(
+            user=self.admin, post=post, author=self.admin,
+            pub_date=post.pub_date)
+        self.assertEqual(index_feed().count(), 30)
+        response = self.act('delete_posts_action')
+        self.assertContains(response, 'Будет удалено постов: 30')
+        self.assertEqual(Post.objects.count(), 30)
+        self.act('delete_posts_action', post='yes')
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(index_feed().count(), 0)
+
+    def test_default_delete_action_removed(self):
+        """Стандартное удаление по одной записи отключено"""
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'value="delete_selected"')
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import cache
+
+from ..models import ArchivedPost, Group, Post
+
+User = get_user_model()
+
+
+class PostsArchiveTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(
+                text=f'Тест текст + {i}',
+                author=cls.user,
+                group=cls.group,
+            )
+            for i in range(15)
+        )
+        old_ids = Post.objects.order_by('pk').values_list(
+            'pk', flat=True)[:8]
+        Post.objects.filter(pk__in=list(old_ids)).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        call_command('archive_posts', batch_size=3, stdout=StringIO())
+
+    def test_old_posts_moved_to_archive(self):
+        """Старые посты переносятся в архив пачками"""
+        self.assertEqual(Post.objects.count(), 7)
+        self.assertEqual(ArchivedPost.objects.count(), 8)
+
+    def test_post_detail_falls_through_to_archive(self):
+        """Страница архивного поста открывается по старому id"""
+        archived = ArchivedPost.objects.first()
+        response = self.guest_client.get(reverse(
+            'posts:post_detail', kwargs={'post_id': archived.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['post'], archived)
+        self.assertEqual(response.context['posts_count'], 15)
+
+    def test_deep_pages_include_archive(self):
+        """Дальние страницы ленты дочитываются из архива"""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                first_page = self.guest_client.get(url).context['page_obj']
+                second_page = self.guest_client.get(
+                    url + '?page=2').context['page_obj']
+                self.assertEqual(len(first_page), 10)
+                self.assertEqual(len(second_page), 5)
+                self.assertTrue(
+                    all(post.is_archived for post in second_page))
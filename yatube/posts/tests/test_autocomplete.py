@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import cache
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class GroupAutocompleteTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        titles = ('Котики', 'котлеты', 'Коты и кошки', 'Собаки')
+        for i, title in enumerate(titles):
+            Group.objects.create(
+                title=title, slug=f'slug-{i}', description='-')
+        cls.group = Group.objects.get(title='Собаки')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тест текст', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def search(self, term):
+        response = self.guest_client.get(
+            reverse('posts:group_autocomplete'), {'q': term})
+        return [item['text'] for item in response.json()['results']]
+
+    def test_prefix_search_ignores_case(self):
+        """Поиск групп идёт по началу названия без учёта регистра"""
+        self.assertEqual(
+            self.search('КОТ'), ['Котики', 'котлеты', 'Коты и кошки'])
+        self.assertEqual(self.search('коты'), ['Коты и кошки'])
+        self.assertEqual(self.search('ошки'), [])
+        self.assertEqual(self.search(''), [])
+
+    def test_title_key_follows_title(self):
+        """Ключ поиска обновляется вместе с названием"""
+        self.group.title = 'Щенки'
+        self.group.save(update_fields=['title'])
+        self.assertEqual(self.search('щен'), ['Щенки'])
+
+    def test_form_renders_selected_group_only(self):
+        """Форма выводит только выбранную группу"""
+        response = self.authorized_client.get(reverse('posts:post_create'))
+        self.assertNotContains(response, 'Котики')
+        self.assertContains(response, 'js/autocomplete.js')
+        response = self.authorized_client.get(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}))
+        self.assertContains(response, 'Собаки')
+        self.assertNotContains(response, 'Котики')
+
+    def test_submitted_group_resolved(self):
+        """Отправленная группа сохраняется"""
+        group = Group.objects.get(title='Котики')
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            {'text': 'Тест текст', 'group': group.pk},
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.group, group)
+
+    def test_admin_search_by_prefix(self):
+        """Поиск групп в админке идёт по началу названия"""
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        self.authorized_client.force_login(admin)
+        response = self.authorized_client.get(
+            reverse('admin:posts_group_changelist'), {'q': 'кот'})
+        self.assertEqual(response.context['cl'].result_count, 3)
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import cache
+
+from ..models import ArchivedPost, Comment, Post
+
+User = get_user_model()
+
+
+class CommentTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.post = Post.objects.create(author=cls.user, text='Тест текст')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def comment(self, text):
+        return self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': text},
+        )
+
+    def test_comment_added_and_counted(self):
+        """Комментарий добавляется и учитывается в счётчике поста"""
+        response = self.comment('Комментарий')
+        self.assertRedirects(response, reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertTrue(Comment.objects.filter(
+            post=self.post, author=self.user, text='Комментарий').exists())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'][0].comments_count, 1)
+
+    def test_guest_cannot_comment(self):
+        """Гость не может комментировать"""
+        self.guest_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'Комментарий'},
+        )
+        self.assertFalse(Comment.objects.exists())
+
+    @override_settings(POSTS_COMMENTS_PER_PAGE=2)
+    def test_comments_keyset_paginated(self):
+        """Комментарии выводятся страницами по курсору"""
+        for i in range(3):
+            self.comment(f'Комментарий {i}')
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        response = self.guest_client.get(url)
+        self.assertEqual(len(response.context['comments']), 2)
+        next_after = response.context['next_after']
+        response = self.guest_client.get(f'{url}?after={next_after}')
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            ['Комментарий 2'],
+        )
+        self.assertIsNone(response.context['next_after'])
+
+    def test_comments_survive_archiving(self):
+        """Комментарии остаются у поста после переноса в архив"""
+        self.comment('Комментарий')
+        Post.objects.update(pub_date=timezone.now() - timedelta(days=1000))
+        call_command('archive_posts', stdout=StringIO())
+        archived = ArchivedPost.objects.get(pk=self.post.pk)
+        self.assertEqual(archived.comments_count, 1)
+        self.assertEqual(Comment.objects.count(), 1)
+        archived.delete()
+        self.assertFalse(Comment.objects.exists())
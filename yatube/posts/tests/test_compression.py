@@ -0,0 +1,99 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import cache
+
+from ..compression import pack, unpack
+from ..models import ArchivedPost, Post
+
+User = get_user_model()
+
+LONG_TEXT = 'Очень длинный пост\n' * 100
+
+
+@override_settings(POSTS_COMPRESS_BODY=True, POSTS_COMPRESS_MIN_LENGTH=100)
+class PostCompressionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_pack_roundtrip(self):
+        """Упакованный текст распаковывается без потерь"""
+        blob = pack(LONG_TEXT, 'html')
+        self.assertEqual(blob[:1], b'\x01')
+        self.assertLess(len(blob), len(LONG_TEXT.encode()))
+        self.assertEqual(unpack(blob), [LONG_TEXT, 'html'])
+        self.assertEqual(pack('a', 'b')[:1], b'\x00')
+
+    def test_long_post_stored_packed(self):
+        """Длинный пост хранится сжатым и лениво распаковывается"""
+        post = Post.objects.create(author=self.user, text=LONG_TEXT)
+        row = Post.objects.filter(pk=post.pk).values(
+            'text', 'text_html', 'body_packed').get()
+        self.assertEqual(row['text'], '')
+        self.assertEqual(row['text_html'], '')
+        self.assertIsNotNone(row['body_packed'])
+        loaded = Post.objects.get(pk=post.pk)
+        self.assertNotIsInstance(loaded.__dict__['text'], str)
+        self.assertEqual(loaded.text, LONG_TEXT)
+        self.assertEqual(str(loaded.html), post.text_html)
+        self.assertEqual(post.text, LONG_TEXT)
+
+    def test_deferred_text_loads_packed_body(self):
+        """Отложенная загрузка текста распаковывает тело поста"""
+        post = Post.objects.create(author=self.user, text=LONG_TEXT)
+        loaded = Post.objects.defer('text', 'body_packed').get(pk=post.pk)
+        self.assertEqual(loaded.text, LONG_TEXT)
+
+    def test_edit_form_shows_unpacked_text(self):
+        """Форма редактирования показывает распакованный текст"""
+        post = Post.objects.create(author=self.user, text=LONG_TEXT)
+        response = self.authorized_client.get(reverse(
+            'posts:post_edit', kwargs={'post_id': post.pk}))
+        self.assertContains(response, 'Очень длинный пост', count=100)
+        response = self.authorized_client.get(reverse(
+            'posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertContains(response, 'Очень длинный пост<br>')
+
+    def test_compress_command_converts_rows(self):
+        """Команда compress_posts упаковывает и распаковывает старые посты"""
+        with self.settings(POSTS_COMPRESS_BODY=False):
+            post = Post.objects.create(author=self.user, text=LONG_TEXT)
+        self.assertIsNone(
+            Post.objects.values_list('body_packed', flat=True).get())
+        call_command('compress_posts', stdout=StringIO())
+        self.assertIsNotNone(
+            Post.objects.values_list('body_packed', flat=True).get())
+        self.assertEqual(Post.objects.get(pk=post.pk).text, LONG_TEXT)
+        with self.settings(POSTS_COMPRESS_BODY=False):
+            call_command('compress_posts', stdout=StringIO())
+        self.assertEqual(
+            Post.objects.values_list('text', flat=True).get(), LONG_TEXT)
+
+    def test_archived_post_stays_packed(self):
+        """Архивная копия упакованного поста хранит только сжатое тело"""
+        post = Post.objects.create(author=self.user, text=LONG_TEXT)
+        ArchivedPost.from_post(Post.objects.get(pk=post.pk)).save()
+        row = ArchivedPost.objects.filter(pk=post.pk).values(
+            'text', 'text_html', 'body_packed').get()
+        self.assertEqual(row['text'], '')
+        self.assertEqual(row['text_html'], '')
+        self.assertIsNotNone(row['body_packed'])
+        self.assertEqual(ArchivedPost.objects.get(pk=post.pk).text, LONG_TEXT)
+
+    def test_render_command_skips_packed_rows(self):
+        """Команда render_posts не перерисовывает упакованные посты"""
+        Post.objects.create(author=self.user, text=LONG_TEXT)
+        output = StringIO()
+        call_command('render_posts', stdout=output)
+        self.assertIn('Post: done, 0 rendered', output.getvalue())
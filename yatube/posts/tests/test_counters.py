@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import cache
+from core.counters import BufferedCounter
+
+from ..counters import post_views
+from ..models import ArchivedPost, Post
+
+User = get_user_model()
+
+
+class PostViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.post = Post.objects.create(author=cls.user, text='Тест текст')
+
+    def setUp(self):
+        cache.clear()
+        post_views.flush()
+        self.guest_client = Client()
+
+    def test_views_buffered_until_flush(self):
+        """Просмотры копятся в памяти и записываются одним сбросом"""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        for _ in range(3):
+            self.guest_client.get(url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+        self.assertEqual(post_views.pending(self.post.pk), 3)
+        post_views.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 3)
+        self.assertEqual(post_views.pending(self.post.pk), 0)
+
+    def test_flush_updates_archived_posts(self):
+        """Сброс учитывает просмотры архивных постов"""
+        other = Post.objects.create(author=self.user, text='Другой')
+        archived = ArchivedPost.from_post(self.post)
+        archived.save()
+        post_views.incr(archived.pk, 2)
+        post_views.incr(other.pk, 5)
+        with self.assertNumQueries(6):
+            post_views.flush()
+        archived.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(archived.views, 2)
+        self.assertEqual(other.views, 5)
+
+    def test_failed_flush_keeps_increments(self):
+        """Неудачный сброс возвращает приращения в буфер"""
+        def broken(counts):
+            raise RuntimeError
+
+        counter = BufferedCounter(broken, interval=60, max_pending=10)
+        counter.incr('a')
+        with self.assertLogs('core.counters', 'ERROR'):
+            counter.flush()
+        counter.incr('a')
+        self.assertEqual(counter.pending('a'), 2)
+
+    def test_overflow_triggers_flush(self):
+        """Переполнение буфера сбрасывает его досрочно"""
+        flushed = []
+        counter = BufferedCounter(flushed.append, interval=60, max_pending=1)
+        counter.incr('a')
+        counter.incr('b')
+        self.assertEqual(flushed, [{'a': 1, 'b': 1}])
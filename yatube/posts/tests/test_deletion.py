@@ -0,0 +1,121 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import cache
+from core.tasks import run_pending
+
+from ..deletion import process_batch, schedule_deletion
+from ..models import Comment, DeletionJob, Follow, Group, Post
+
+User = get_user_model()
+
+
+class DeletionJobTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.other_user = User.objects.create_user(username='Other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Тест текст + {i}', author=cls.user, group=cls.group)
+            for i in range(5)
+        )
+        Post.objects.create(
+            text='Чужой пост', author=cls.other_user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_scheduled_user_hidden_immediately(self):
+        """Пользователь скрыт сразу после постановки в очередь"""
+        schedule_deletion(self.user)
+        response = self.guest_client.get(reverse(
+            'posts:profile', kwargs={'username': self.user}))
+        self.assertEqual(response.status_code, 404)
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 1)
+        self.assertTrue(User.objects.filter(pk=self.user.pk).exists())
+
+    def test_user_deleted_in_batches(self):
+        """Посты пользователя удаляются пачками, затем сам пользователь"""
+        job = schedule_deletion(self.user)
+        self.assertTrue(process_batch(job, 2))
+        self.assertEqual(Post.objects.filter(author=self.user).count(), 3)
+        call_command('process_deletions', batch_size=2, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertIsNotNone(job.finished)
+        self.assertEqual(job.processed, 5)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_group_posts_detached(self):
+        """Посты удаляемой группы остаются без группы"""
+        job = schedule_deletion(self.group)
+        response = self.guest_client.get(reverse(
+            'posts:group_list', kwargs={'slug': self.group.slug}))
+        self.assertEqual(response.status_code, 404)
+        call_command('process_deletions', batch_size=4, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.processed, 6)
+        self.assertFalse(Group.objects.filter(pk=self.group.pk).exists())
+        self.assertEqual(Post.objects.filter(group=None).count(), 6)
+        self.assertEqual(
+            DeletionJob.objects.filter(finished__isnull=True).count(), 0)
+
+    def test_deletion_runs_in_task_queue(self):
+        """Удаление выполняется фоновыми задачами"""
+        job = schedule_deletion(self.user)
+        run_pending()
+        job.refresh_from_db()
+        self.assertIsNotNone(job.finished)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+
+    def test_user_dependents_deleted_in_batches(self):
+        """Комментарии и подписки пользователя удаляются пачками"""
+        post = Post.objects.get(author=self.other_user)
+        for i in range(3):
+            Comment.objects.create(
+                post=post, author=self.user, text=f'Комментарий {i}')
+        Follow.objects.create(user=self.user, author=self.other_user)
+        Follow.objects.create(user=self.other_user, author=self.user)
+        job = schedule_deletion(self.user)
+        for _ in range(3):
+            self.assertTrue(process_batch(job, 5))
+        self.assertEqual(Follow.objects.count(), 0)
+        self.assertTrue(process_batch(job, 2))
+        self.assertEqual(Comment.objects.count(), 1)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertTrue(User.objects.filter(pk=self.user.pk).exists())
+        while process_batch(job, 2):
+            pass
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(Comment.objects.count(), 0)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_admin_delete_button_schedules_job(self):
+        """Кнопка удаления в админке ставит удаление в очередь"""
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        client = Client()
+        client.force_login(admin)
+        for obj, name in ((self.user, 'auth_user'),
+                          (self.group, 'posts_group')):
+            url = reverse(f'admin:{name}_delete', args=(obj.pk,))
+            self.assertEqual(client.get(url).status_code, 200)
+            response = client.post(url, {'post': 'yes'})
+            self.assertRedirects(
+                response, reverse(f'admin:{name}_changelist'))
+            self.assertTrue(type(obj).objects.filter(pk=obj.pk).exists())
+            self.assertTrue(DeletionJob.objects.filter(
+                object_id=obj.pk, finished__isnull=True).exists())
@@ -0,0 +1,99 @@
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import cache
+
+from .. import duplicates
+from ..models import Post, PostSignature, SignatureBucket
+
+User = get_user_model()
+
+TEXT = (
+    'Продаю отличный велосипед почти новый недорого звоните в любое '
+    'время по указанному номеру телефона самовывоз из центра города'
+)
+
+
+class DuplicatesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.bot = User.objects.create_user(username='Bot')
+        cls.post = Post.objects.create(author=cls.user, text=TEXT)
+
+    def setUp(self):
+        cache.clear()
+        self.bot_client = Client()
+        self.bot_client.force_login(self.bot)
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def create(self, text):
+        return self.bot_client.post(
+            reverse('posts:post_create'), {'text': text})
+
+    def test_signature_estimates_similarity(self):
+        """Сигнатуры похожих текстов совпадают почти полностью"""
+        same = duplicates.signature(TEXT)
+        close = duplicates.signature(TEXT + ' срочно')
+        other = duplicates.signature(
+            'Сегодня в парке прошёл большой концерт местных музыкантов '
+            'и все гости остались довольны погодой и программой'
+        )
+        self.assertEqual(duplicates.similarity(same, same), 1)
+        self.assertGreater(duplicates.similarity(same, close), 0.7)
+        self.assertLess(duplicates.similarity(same, other), 0.2)
+        self.assertIsNone(duplicates.signature('Короткий текст'))
+
+    def test_duplicate_from_other_author_rejected(self):
+        """Почти такой же пост другого автора отклоняется"""
+        response = self.create(TEXT.upper())
+        self.assertFormError(
+            response, 'form', 'text',
+            'Почти такая же запись уже опубликована',
+        )
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_similar_post_flagged(self):
+        """Похожий пост публикуется с пометкой"""
+        self.create(TEXT.replace('велосипед', 'самокат') + ' торг уместен')
+        post = Post.objects.get(author=self.bot)
+        self.assertTrue(post.is_flagged)
+        self.assertTrue(PostSignature.objects.filter(post=post).exists())
+
+    def test_unique_post_indexed(self):
+        """Обычный пост публикуется и попадает в индекс"""
+        self.create(
+            'Сегодня в парке прошёл большой концерт местных музыкантов '
+            'и все гости остались довольны погодой и программой'
+        )
+        post = Post.objects.get(author=self.bot)
+        self.assertFalse(post.is_flagged)
+        self.assertEqual(
+            SignatureBucket.objects.filter(signature__post=post).count(),
+            settings.POSTS_DUPLICATE_BANDS,
+        )
+
+    def test_edit_does_not_match_itself(self):
+        """Редактирование поста не считается дубликатом его самого"""
+        response = self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            {'text': TEXT + ' срочно'},
+        )
+        self.assertRedirects(response, reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}))
+
+    def test_index_command(self):
+        """Команда index_signatures заполняет индекс"""
+        PostSignature.objects.all().delete()
+        call_command('index_signatures', stdout=StringIO())
+        self.assertTrue(
+            PostSignature.objects.filter(post=self.post).exists())
+        self.assertEqual(duplicates.find_similar(
+            duplicates.signature(TEXT))[0], self.post.pk)
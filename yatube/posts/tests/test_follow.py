@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import cache
+from core.tasks import run_pending
+
+from ..deletion import schedule_deletion
+from ..models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class FollowTimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(username='Author')
+        cls.stranger = User.objects.create_user(username='Stranger')
+        for i in range(15):
+            Post.objects.create(author=cls.author, text=f'Пост автора {i}')
+        Post.objects.create(author=cls.stranger, text='Чужой пост')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def follow(self):
+        self.authorized_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author}))
+        run_pending()
+
+    def read(self, cursor=None):
+        url = reverse('posts:follow_index')
+        if cursor:
+            url += f'?before={cursor}'
+        return self.authorized_client.get(url).context
+
+    def test_follow_and_unfollow(self):
+        """Подписка наполняет ленту, отписка очищает её"""
+        self.follow()
+        self.assertTrue(Follow.objects.filter(
+            user=self.user, author=self.author).exists())
+        self.assertEqual(TimelineEntry.objects.count(), 15)
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author}))
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.read()['posts'], [])
+
+    def test_keyset_pagination(self):
+        """Лента подписок листается по курсору"""
+        self.follow()
+        first = self.read()
+        self.assertEqual(len(first['posts']), 10)
+        second = self.read(first['next_cursor'])
+        self.assertEqual(len(second['posts']), 5)
+        self.assertIsNone(second['next_cursor'])
+        self.assertEqual(
+            set(first['posts']) | set(second['posts']),
+            set(Post.objects.filter(author=self.author)),
+        )
+
+    def test_new_post_fanned_out(self):
+        """Новый пост автора попадает в ленты подписчиков"""
+        self.follow()
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Свежий пост'})
+        run_pending()
+        self.assertEqual(self.read()['posts'][0].text, 'Свежий пост')
+        self.assertNotIn(
+            'Чужой пост', [post.text for post in self.read()['posts']])
+
+    @override_settings(POSTS_FANOUT_MAX_FOLLOWERS=0)
+    def test_heavy_author_read_on_request(self):
+        """Посты популярного автора читаются без материализации"""
+        self.follow()
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Свежий пост'})
+        run_pending()
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.read()['posts'][0].text, 'Свежий пост')
+
+    def test_pending_author_hidden(self):
+        """Посты удаляемого автора пропадают из ленты подписок"""
+        self.follow()
+        schedule_deletion(User.objects.get(pk=self.author.pk))
+        self.assertEqual(self.read()['posts'], [])
+        TimelineEntry.objects.all().delete()
+        with self.settings(POSTS_FANOUT_MAX_FOLLOWERS=0):
+            self.assertEqual(self.read()['posts'], [])
+
+    def test_rebuild_command(self):
+        """Команда rebuild_timelines восстанавливает ленты"""
+        self.follow()
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(TimelineEntry.objects.count(), 15)
@@ -2,6 +2,8 @@ from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 
+from core.cache import cache
+
 from ..forms import PostForm
 from ..models import Group, Post
 
@@ -26,6 +28,7 @@ class PostsFormTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import cache
+
+from ..bulk import delete_posts, set_group
+from ..deletion import schedule_deletion
+from ..models import ArchivedPost, Group, GroupStats, Post
+
+User = get_user_model()
+
+STATS_FIELDS = ('group_id', 'posts_count', 'recent_count', 'last_post_date')
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.group = Group.objects.create(
+            title='Большая группа', slug='big', description='-')
+        cls.other = Group.objects.create(
+            title='Альфа', slug='alpha', description='-')
+        cls.empty = Group.objects.create(
+            title='Пустая группа', slug='empty', description='-')
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Текст {i}')
+            for i in range(3)
+        ]
+        Post.objects.create(author=cls.user, group=cls.other, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def stats(self, group):
+        return GroupStats.objects.get(group=group)
+
+    def snapshot(self):
+        return set(GroupStats.objects.values_list(*STATS_FIELDS))
+
+    def test_stats_follow_posts(self):
+        """Статистика групп обновляется при записи постов"""
+        stats = self.stats(self.group)
+        self.assertEqual((stats.posts_count, stats.recent_count), (3, 3))
+        self.assertEqual(stats.last_post_date, self.posts[-1].pub_date)
+        self.assertIsNone(self.stats(self.empty).last_post_date)
+        latest = self.posts[-1]
+        latest.group = self.other
+        latest.save()
+        stats = self.stats(self.group)
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.last_post_date, self.posts[1].pub_date)
+        self.assertEqual(self.stats(self.other).posts_count, 2)
+        latest.delete()
+        self.assertEqual(self.stats(self.other).posts_count, 1)
+
+    def test_archived_posts_counted(self):
+        """Архивные посты учитываются, перенос в архив не меняет счётчики"""
+        call_command('archive_posts', days=-1, stdout=StringIO())
+        self.assertEqual(self.stats(self.group).posts_count, 3)
+        ArchivedPost.objects.filter(group=self.group).first().delete()
+        self.assertEqual(self.stats(self.group).posts_count, 2)
+
+    def test_refresh_matches_incremental(self):
+        """Пересчёт совпадает с накопленной статистикой"""
+        before = self.snapshot()
+        call_command('refresh_group_stats', batch_size=2, stdout=StringIO())
+        self.assertEqual(before, self.snapshot())
+
+    def test_refresh_ages_out_recent_posts(self):
+        """Пересчёт убирает из недавних старые посты"""
+        Post.objects.filter(pk=self.posts[0].pk).update(
+            pub_date=timezone.now() - timedelta(days=100))
+        call_command('refresh_group_stats', stdout=StringIO())
+        stats = self.stats(self.group)
+        self.assertEqual((stats.posts_count, stats.recent_count), (3, 2))
+
+    def test_bulk_actions_refresh_stats(self):
+        """Массовые действия пересчитывают статистику групп"""
+        set_group(Post.objects.filter(group=self.other), self.group, 1)
+        self.assertEqual(self.stats(self.group).posts_count, 4)
+        self.assertEqual(self.stats(self.other).posts_count, 0)
+        delete_posts(Post.objects.filter(group=self.group), 1)
+        stats = self.stats(self.group)
+        self.assertEqual((stats.posts_count, stats.last_post_date), (0, None))
+
+    def test_group_index(self):
+        """Список сообществ сортируется и скрывает удаляемые группы"""
+        orderings = {
+            'posts': [self.group, self.other, self.empty],
+            'last': [self.other, self.group, self.empty],
+            'title': [self.other, self.group, self.empty],
+        }
+        for sort, expected in orderings.items():
+            with self.subTest(sort=sort):
+                response = self.guest_client.get(
+                    reverse('posts:group_index', args=(sort,)))
+                self.assertEqual(
+                    [stats.group for stats in response.context['page_obj']],
+                    expected,
+                )
+        schedule_deletion(self.other)
+        response = self.guest_client.get(reverse('posts:group_index'))
+        self.assertNotIn(
+            self.other,
+            [stats.group for stats in response.context['page_obj']],
+        )
+        response = self.guest_client.get('/groups/by/unknown/')
+        self.assertEqual(response.status_code, 404)
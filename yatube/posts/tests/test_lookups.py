@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.http import Http404
+from django.test import TestCase
+
+from core.cache import cache
+
+from ..lookups import get_author_or_404, get_group_or_404
+from ..models import Group
+
+User = get_user_model()
+
+
+class LookupCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='Name', first_name='Имя')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_warm_lookup_skips_db(self):
+        """Повторный поиск группы и автора не обращается к БД"""
+        get_group_or_404(self.group.slug)
+        get_author_or_404(self.user.username)
+        with self.assertNumQueries(0):
+            group = get_group_or_404(self.group.slug)
+            author = get_author_or_404(self.user.username)
+        self.assertEqual(group.title, self.group.title)
+        self.assertEqual(author.as_user().get_full_name(), 'Имя')
+        with self.assertRaises(AttributeError):
+            group.title = 'Другое название'
+
+    def test_missing_cached_until_created(self):
+        """Отсутствие группы кэшируется до её создания"""
+        with self.assertRaises(Http404):
+            get_group_or_404('new-slug')
+        with self.assertNumQueries(0), self.assertRaises(Http404):
+            get_group_or_404('new-slug')
+        Group.objects.create(title='Новая', slug='new-slug')
+        self.assertEqual(get_group_or_404('new-slug').title, 'Новая')
+
+    def test_renamed_group_invalidated(self):
+        """Изменение группы сбрасывает закэшированную запись"""
+        get_group_or_404(self.group.slug)
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'renamed'
+        group.save()
+        with self.assertRaises(Http404):
+            get_group_or_404('test-slug')
+        self.assertEqual(get_group_or_404('renamed').pk, self.group.pk)
@@ -1,5 +1,8 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 
 from ..models import Group, Post
 
@@ -27,3 +30,38 @@ class PostModelTest(TestCase):
         self.assertEqual(expected_group_name, str(self.group))
         expected_post_name = self.post.text[:15]
         self.assertEqual(expected_post_name, str(self.post))
+
+
+class PostRenderedTextTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+
+    def test_html_rendered_on_save(self):
+        """При сохранении поста текст экранируется и переносы заменяются"""
+        post = Post.objects.create(author=self.user, text='<b>a</b>\nb')
+        self.assertEqual(post.text_html, '&lt;b&gt;a&lt;/b&gt;<br>b')
+        post.text = 'c\nd'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, 'c<br>d')
+
+    @override_settings(POSTS_PREVIEW_CHARS=5)
+    def test_preview_truncated(self):
+        """Для длинного поста сохраняется укороченное превью"""
+        post = Post.objects.create(author=self.user, text='a\nbcdefgh')
+        self.assertTrue(post.is_truncated)
+        self.assertEqual(post.preview_html, 'a<br>bc…')
+        post = Post.objects.create(author=self.user, text='abc')
+        self.assertFalse(post.is_truncated)
+
+    def test_backfill_command(self):
+        """Команда render_posts заполняет HTML у старых постов"""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'x\n{i}') for i in range(3))
+        self.assertEqual(Post.objects.filter(text_html='').count(), 3)
+        call_command('render_posts', batch_size=2, stdout=StringIO())
+        self.assertFalse(Post.objects.filter(text_html='').exists())
+        self.assertFalse(Post.objects.filter(preview_html='').exists())
+        self.assertEqual(Post.objects.get(text='x\n2').html, 'x<br>2')
@@ -0,0 +1,109 @@
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import cache
+
+from .. import months
+from ..models import ArchivedPost, Group, MonthlyPostCount, Post
+
+User = get_user_model()
+
+
+class MonthArchiveTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='-')
+        cls.other = Group.objects.create(
+            title='Другая группа', slug='other', description='-')
+        cls.now = timezone.localtime()
+        for i in range(3):
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Текст {i}')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def count(self, scope, year=None, month=None):
+        row = MonthlyPostCount.objects.filter(
+            scope=scope,
+            year=year or self.now.year,
+            month=month or self.now.month,
+        ).first()
+        return row.count if row else 0
+
+    def backdate(self, post, year, month):
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=timezone.make_aware(datetime(year, month, 15)))
+
+    def test_counts_follow_posts(self):
+        """Счётчики месяцев обновляются при изменении постов"""
+        group_scope = months.group_scope(self.group.pk)
+        self.assertEqual(self.count(months.SITE), 3)
+        self.assertEqual(self.count(months.author_scope(self.user.pk)), 3)
+        self.assertEqual(self.count(group_scope), 3)
+        post = Post.objects.first()
+        post.group = self.other
+        post.save()
+        self.assertEqual(self.count(group_scope), 2)
+        self.assertEqual(self.count(months.group_scope(self.other.pk)), 1)
+        post.delete()
+        self.assertEqual(self.count(months.SITE), 2)
+        self.assertEqual(self.count(months.group_scope(self.other.pk)), 0)
+
+    def test_archiving_keeps_counts(self):
+        """Перенос в архив не меняет счётчики, удаление из архива меняет"""
+        call_command('archive_posts', days=-1, stdout=StringIO())
+        self.assertEqual(ArchivedPost.objects.count(), 3)
+        self.assertEqual(self.count(months.SITE), 3)
+        ArchivedPost.objects.first().delete()
+        self.assertEqual(self.count(months.SITE), 2)
+
+    def test_month_pages(self):
+        """Архив месяца показывает посты месяца и навигацию"""
+        old = Post.objects.first()
+        self.backdate(old, 2020, 2)
+        call_command('rebuild_month_counts', stdout=StringIO())
+        response = self.guest_client.get(
+            reverse('posts:month_archive', args=(2020, 2)))
+        self.assertEqual(list(response.context['page_obj']), [old])
+        self.assertEqual(
+            [(item['date'].year, item['date'].month, item['count'])
+             for item in response.context['months']],
+            [(self.now.year, self.now.month, 2), (2020, 2, 1)],
+        )
+        response = self.guest_client.get(reverse(
+            'posts:group_month_archive',
+            args=(self.group.slug, self.now.year, self.now.month)))
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertEqual(response.context['group'].pk, self.group.pk)
+        response = self.guest_client.get(reverse(
+            'posts:profile_month_archive',
+            args=(self.user.username, 2020, 3)))
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_invalid_month(self):
+        """Несуществующий месяц отдаёт 404"""
+        response = self.guest_client.get('/archive/2020/13/')
+        self.assertEqual(response.status_code, 404)
+        response = self.guest_client.get('/archive/9999/12/')
+        self.assertEqual(response.status_code, 404)
+        response = self.guest_client.get('/archive/9999/11/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_rebuild_matches_incremental(self):
+        """Пересчёт совпадает с накопленными счётчиками"""
+        before = set(MonthlyPostCount.objects.values_list(
+            'scope', 'year', 'month', 'count'))
+        call_command('rebuild_month_counts', stdout=StringIO())
+        self.assertEqual(before, set(MonthlyPostCount.objects.values_list(
+            'scope', 'year', 'month', 'count')))
@@ -0,0 +1,102 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import cache
+from core.tasks import run_pending
+
+from ..models import Post, PostTerm, RelatedPost
+from ..related import related_posts
+
+User = get_user_model()
+
+
+class RelatedPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.cats = Post.objects.create(
+            author=cls.user, text='Кошки любят тёплый диван')
+        cls.dogs = Post.objects.create(
+            author=cls.user, text='Собаки любят гулять в парке')
+        cls.sofa = Post.objects.create(
+            author=cls.user, text='Новый диван для кошки')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def related(self, post):
+        return list(RelatedPost.objects.filter(
+            post=post).values_list('other_id', flat=True))
+
+    def test_rebuild_command(self):
+        """Команда rebuild_related строит индекс и соседей"""
+        call_command('rebuild_related', stdout=StringIO())
+        self.assertEqual(self.related(self.cats)[0], self.sofa.pk)
+        self.assertEqual(self.related(self.dogs), [self.cats.pk])
+        self.assertTrue(PostTerm.objects.filter(
+            post=self.sofa, term='диван').exists())
+
+    def test_rebuild_in_small_batches(self):
+        """Пересборка мелкими пачками даёт тех же соседей"""
+        call_command('rebuild_related', stdout=StringIO())
+        expected = {
+            post.pk: self.related(post)
+            for post in (self.cats, self.dogs, self.sofa)
+        }
+        # As if indexed by a post created while the rebuild runs.
+        RelatedPost.objects.create(
+            post_id=self.sofa.pk + 100, other=self.cats, score=1)
+        output = StringIO()
+        call_command('rebuild_related', batch_size=1, stdout=output)
+        self.assertIn('3 posts indexed', output.getvalue())
+        self.assertEqual({
+            post.pk: self.related(post)
+            for post in (self.cats, self.dogs, self.sofa)
+        }, expected)
+        self.assertTrue(RelatedPost.objects.filter(
+            post_id=self.sofa.pk + 100).exists())
+
+    def test_new_post_indexed_incrementally(self):
+        """Новый пост индексируется и попадает к соседям"""
+        call_command('rebuild_related', stdout=StringIO())
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            {'text': 'Собаки в парке у дивана'},
+        )
+        run_pending()
+        post = Post.objects.get(text='Собаки в парке у дивана')
+        self.assertEqual(self.related(post)[0], self.dogs.pk)
+        self.assertEqual(self.related(self.dogs)[0], post.pk)
+
+    def test_edit_reindexes_post(self):
+        """Редактирование поста пересчитывает его соседей"""
+        call_command('rebuild_related', stdout=StringIO())
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.dogs.pk}),
+            {'text': 'Кошки спят на диване'},
+        )
+        run_pending()
+        self.assertEqual(
+            set(self.related(self.dogs)), {self.cats.pk, self.sofa.pk})
+        self.assertFalse(PostTerm.objects.filter(
+            post=self.dogs, term='собаки').exists())
+
+    def test_post_detail_single_query(self):
+        """Похожие записи загружаются одним запросом"""
+        call_command('rebuild_related', stdout=StringIO())
+        with self.assertNumQueries(1):
+            previews = [
+                item.other.preview for item in related_posts(self.cats)
+            ]
+        self.assertEqual(len(previews), 2)
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.cats.pk}))
+        self.assertContains(response, 'Новый диван для кошки')
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from core.cache import cache
+
+from .. import sitemaps
+from ..deletion import schedule_deletion
+from ..models import Group, Post
+
+User = get_user_model()
+
+SITEMAP_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    POSTS_SITEMAP_ROOT=SITEMAP_ROOT,
+    POSTS_SITEMAP_BASE_URL='http://testserver',
+    POSTS_SITEMAP_CHUNK_SIZE=4,
+    POSTS_SITEMAP_BATCH_SIZE=3,
+)
+class SitemapTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='-')
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Текст {i}')
+            for i in range(6)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SITEMAP_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(SITEMAP_ROOT, ignore_errors=True)
+        self.guest_client = Client()
+
+    def chunk(self, post):
+        return f'posts-{post.pk // 4}.xml'
+
+    def read(self, name):
+        with open(os.path.join(SITEMAP_ROOT, name), encoding='utf-8') as f:
+            return f.read()
+
+    def test_chunks_cover_every_url(self):
+        """Сайтмап разбит на части и содержит все адреса"""
+        written, total = sitemaps.build()
+        self.assertEqual(written, total)
+        names = {self.chunk(post) for post in self.posts}
+        self.assertEqual(total, len(names) + 2)
+        index = self.read(sitemaps.INDEX)
+        for name in names:
+            self.assertIn(f'http://testserver/sitemaps/{name}', index)
+        for post in self.posts:
+            self.assertIn(
+                f'<loc>http://testserver/posts/{post.pk}/</loc>',
+                self.read(self.chunk(post)),
+            )
+        self.assertIn(
+            '<loc>http://testserver/profile/Name/</loc>',
+            self.read(f'profiles-{self.user.pk // 4}.xml'),
+        )
+        self.assertIn(
+            '<loc>http://testserver/group/test-slug/</loc>',
+            self.read(f'groups-{self.group.pk // 4}.xml'),
+        )
+
+    def test_only_changed_chunks_rewritten(self):
+        """Повторная сборка переписывает только изменённые части"""
+        sitemaps.build()
+        self.assertEqual(sitemaps.build()[0], 0)
+        post = self.posts[0]
+        Post.objects.filter(pk=post.pk).delete()
+        self.assertEqual(sitemaps.build()[0], 1)
+        self.assertNotIn(
+            f'/posts/{post.pk}/</loc>', self.read(self.chunk(post)))
+        User.objects.filter(pk=self.user.pk).update(username='Renamed')
+        self.assertEqual(sitemaps.build()[0], 1)
+        self.assertEqual(sitemaps.build(force=True)[0], sitemaps.build()[1])
+
+    def test_hidden_authors_dropped(self):
+        """Посты и профили удаляемых авторов пропадают из сайтмапа"""
+        sitemaps.build()
+        schedule_deletion(self.user)
+        call_command('build_sitemaps', stdout=StringIO())
+        index = self.read(sitemaps.INDEX)
+        self.assertNotIn('posts-', index)
+        self.assertNotIn('profiles-', index)
+        self.assertFalse(os.path.exists(
+            os.path.join(SITEMAP_ROOT, self.chunk(self.posts[0]))))
+
+    def test_served_from_disk(self):
+        """Сайтмап отдаётся с диска"""
+        response = self.guest_client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, 404)
+        sitemaps.build()
+        response = self.guest_client.get('/sitemap.xml')
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        self.assertIn(b'<sitemapindex', b''.join(response.streaming_content))
+        response = self.guest_client.get(
+            f'/sitemaps/profiles-{self.user.pk // 4}.xml')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,121 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.cache import cache
+
+from .. import static_site
+from ..counters import post_views
+from ..models import Group, Post, RelatedPost
+
+User = get_user_model()
+
+
+class StaticSiteTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Name')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='-')
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Текст {i}')
+            for i in range(12)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        post_views.flush()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def build(self, force=False):
+        return static_site.build(self.root, workers=1, force=force)
+
+    def read(self, url):
+        with open(static_site._target(self.root, url), encoding='utf-8') as f:
+            return f.read()
+
+    def test_pages_exported(self):
+        """Все публичные страницы выгружаются с манифестом"""
+        rendered, total = self.build()
+        self.assertEqual(rendered, total)
+        with open(os.path.join(self.root, static_site.MANIFEST)) as f:
+            manifest = json.load(f)
+        expected = {
+            '/', '/page/2/', '/group/test-slug/', '/group/test-slug/page/2/',
+            '/profile/Name/', '/profile/Name/page/2/',
+            '/about/author/', '/about/tech/',
+        } | {f'/posts/{post.pk}/' for post in self.posts}
+        self.assertEqual(set(manifest), expected)
+        self.assertIn('Текст 11', self.read('/'))
+        self.assertIn('href="/group/test-slug/page/2/"',
+                      self.read('/group/test-slug/'))
+        self.assertIn('href="/group/test-slug/"',
+                      self.read('/group/test-slug/page/2/'))
+        self.assertEqual(post_views.pending(self.posts[0].pk), 0)
+
+    def test_unchanged_pages_skipped(self):
+        """Повторная сборка рендерит только страницы с изменёнными данными"""
+        self.build()
+        self.assertEqual(self.build()[0], 0)
+        post = Post.objects.get(pk=self.posts[0].pk)
+        post.text = 'Изменённый текст'
+        post.save()
+        # The post itself, the last page of each of its three feeds.
+        self.assertEqual(self.build()[0], 4)
+        self.assertIn('Изменённый текст', self.read(f'/posts/{post.pk}/'))
+        _, total = self.build()
+        self.assertEqual(self.build(force=True)[0], total)
+
+    def test_author_and_group_changes_rerender(self):
+        """Страницы пересобираются при смене автора, группы и счётчиков"""
+        self.build()
+        url = f'/posts/{self.posts[0].pk}/'
+        Post.objects.create(author=self.user, text='Новый пост')
+        self.build()
+        self.assertIn('<span >13</span>', self.read(url))
+        self.assertIn('Всего постов: 13', self.read('/profile/Name/'))
+        User.objects.filter(pk=self.user.pk).update(first_name='Новое')
+        self.build()
+        self.assertIn('Новое', self.read(url))
+        self.assertIn('Новое', self.read('/'))
+        Group.objects.filter(pk=self.group.pk).update(title='Другая')
+        self.build()
+        self.assertIn('Другая', self.read(url))
+        RelatedPost.objects.create(
+            post=self.posts[0], other=self.posts[1], score=1)
+        self.assertEqual(self.build()[0], 1)
+
+    def test_views_rerender_post(self):
+        """Страница поста пересобирается при изменении числа просмотров"""
+        self.build()
+        Post.objects.filter(pk=self.posts[0].pk).update(views=7)
+        self.assertEqual(self.build()[0], 1)
+        self.assertIn(
+            'Просмотров: 7', self.read(f'/posts/{self.posts[0].pk}/'))
+
+    def test_static_files_exported(self):
+        """Статика копируется в выгрузку вместе со страницами"""
+        self.build()
+        path = os.path.join(self.root, 'static', 'css', 'bootstrap.min.css')
+        self.assertTrue(os.path.isfile(path))
+        self.assertIn('href="/static/css/bootstrap.min.css"', self.read('/'))
+
+    def test_removed_pages_deleted(self):
+        """Страницы удалённых постов удаляются из выгрузки"""
+        call_command(
+            'build_static_site', output=self.root, workers=1,
+            stdout=StringIO(),
+        )
+        url = f'/posts/{self.posts[0].pk}/'
+        Post.objects.filter(pk=self.posts[0].pk).delete()
+        self.build()
+        self.assertFalse(os.path.exists(static_site._target(self.root, url)))
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import cache
+
+from .. import trending
+from ..models import Comment, Group, Post, TrendingScore
+
+User = get_user_model()
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        trending.scores.flush()
+        TrendingScore.objects.all().delete()
+        cls.user = User.objects.create_user(username='Name')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='-')
+        cls.quiet = Group.objects.create(
+            title='Тихая группа', slug='quiet', description='-')
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Текст {i}')
+            for i in range(3)
+        ]
+        trending.scores.flush()
+
+    def setUp(self):
+        cache.clear()
+        trending.scores.flush()
+        trending.snapshots.clear()
+        self.guest_client = Client()
+
+    def view(self, post, times=1):
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        for _ in range(times):
+            self.guest_client.get(url)
+
+    def test_landmark_keeps_ratios(self):
+        """Вес события удваивается за период полураспада"""
+        half_life = settings.POSTS_TRENDING_HALF_LIFE
+        period, factor = trending.landmark(1000 * half_life)
+        later_period, later_factor = trending.landmark(1001 * half_life)
+        self.assertEqual(period, later_period)
+        self.assertAlmostEqual(later_factor / factor, 2)
+        next_period, _ = trending.landmark(
+            (period + 1) * trending.PERIOD * half_life)
+        self.assertEqual(next_period, period + 1)
+
+    def test_scores_buffered_until_flush(self):
+        """События копятся в памяти и записываются одним сбросом"""
+        self.view(self.posts[0], 2)
+        self.assertFalse(
+            TrendingScore.objects.filter(kind=TrendingScore.POST).exists())
+        trending.scores.flush()
+        self.assertEqual(trending.trending_posts()[0], self.posts[0])
+
+    def test_top_posts_and_groups(self):
+        """Популярные посты и группы упорядочены по счёту"""
+        self.view(self.posts[0])
+        Comment.objects.create(
+            post=self.posts[1], author=self.user, text='Комментарий')
+        Post.objects.create(author=self.user, group=self.quiet, text='Пост')
+        trending.scores.flush()
+        self.assertEqual(
+            trending.trending_posts()[:2], [self.posts[1], self.posts[0]])
+        self.assertEqual(trending.trending_groups(), [self.group, self.quiet])
+
+    def test_rebase_moves_old_scores(self):
+        """Смена опорной точки пересчитывает и удаляет старые счёты"""
+        period = trending.landmark()[0]
+        TrendingScore.objects.bulk_create([
+            TrendingScore(kind=TrendingScore.POST, object_id=1,
+                          period=period - 1, score=2.0 ** trending.PERIOD),
+            TrendingScore(kind=TrendingScore.POST, object_id=2,
+                          period=period - 2, score=1.0),
+        ])
+        trending.flush_scores({(TrendingScore.POST, 1, period): 1.0})
+        self.assertEqual(
+            list(TrendingScore.objects.filter(
+                kind=TrendingScore.POST
+            ).values_list('object_id', 'period', 'score')),
+            [(1, period, 2.0)],
+        )
+
+    def test_index_shows_trending(self):
+        """Главная страница показывает популярное из памяти процесса"""
+        self.view(self.posts[2])
+        trending.scores.flush()
+        trending.trending_posts()
+        trending.trending_groups()
+        with self.assertNumQueries(0):
+            self.assertEqual(trending.trending_posts(), [self.posts[2]])
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(
+            response.context['trending_posts'], [self.posts[2]])
+        self.assertEqual(response.context['trending_groups'], [self.group])
+
+    def test_deleted_post_dropped(self):
+        """Удалённый пост пропадает из популярного"""
+        self.view(self.posts[0])
+        trending.scores.flush()
+        Post.objects.get(pk=self.posts[0].pk).delete()
+        trending.snapshots.clear()
+        self.assertEqual(trending.trending_posts(), [])
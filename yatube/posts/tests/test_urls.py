@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 
+from core.cache import cache
+
 from ..models import Group, Post
 
 User = get_user_model()
@@ -23,6 +25,7 @@ class PostsUrlTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.wrong_authorized_client = Client()
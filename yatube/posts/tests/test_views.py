@@ -3,6 +3,8 @@ from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 
+from core.cache import cache
+
 from ..models import Group, Post
 
 User = get_user_model()
@@ -25,6 +27,7 @@ class PostsPagesTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -127,6 +130,25 @@ class PostsPagesTest(TestCase):
                 response = self.authorized_client.get(url)
                 self.assertContains(response, new_post)
 
+    def test_feed_cached_until_post_saved(self):
+        """Лента берётся из кэша до сохранения нового поста"""
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        Post.objects.bulk_create([Post(author=self.user, text='Мимо кэша')])
+        response = self.guest_client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.guest_client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+
+    def test_feeds_do_not_load_full_text(self):
+        """Ленты выводят превью без загрузки полного текста"""
+        response = self.guest_client.get(reverse('posts:index'))
+        post = response.context['page_obj'][0]
+        self.assertEqual(
+            post.get_deferred_fields(), {'text', 'text_html', 'body_packed'})
+        self.assertContains(response, self.post.preview_html)
+
     def test_post_not_in_other_group_page(self):
         """Пост НЕ появился на странице чужой группы"""
         new_post = Post.objects.create(
@@ -164,6 +186,7 @@ class PaginatorViewTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
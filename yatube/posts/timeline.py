@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.cache import cache
+
+from .deletion import pending
+from .feeds import SUMMARY_DEFERRED
+from .models import DeletionJob, Follow, Post, TimelineEntry
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(pub_date, post_id):
+    return f'{(pub_date - EPOCH) // timedelta(microseconds=1)}-{post_id}'
+
+
+def decode_cursor(cursor):
+    try:
+        micros, post_id = (int(part) for part in cursor.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + timedelta(microseconds=micros), post_id
+
+
+def _heavy(follows):
+    return follows.values('author').annotate(
+        followers=Count('pk')
+    ).filter(
+        followers__gt=settings.POSTS_FANOUT_MAX_FOLLOWERS
+    ).values('author')
+
+
+def heavy_authors():
+    """Authors with too many followers to fan their posts out on write."""
+    return cache.get_or_set(
+        'timeline:heavy',
+        lambda: set(
+            _heavy(Follow.objects.all()).values_list('author', flat=True)
+        ),
+        timeout=settings.POSTS_HEAVY_AUTHORS_TIMEOUT,
+        tags=('timeline:heavy',),
+    )
+
+
+def _insert(user_ids, posts):
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id, post_id=post.pk,
+                author_id=post.author_id, pub_date=post.pub_date,
+            )
+            for user_id in user_ids for post in posts
+        ),
+        batch_size=settings.POSTS_FANOUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out(post):
+    followers = Follow.objects.filter(author_id=post.author_id)
+    if followers.count() > settings.POSTS_FANOUT_MAX_FOLLOWERS:
+        if post.author_id not in heavy_authors():
+            cache.invalidate_tags('timeline:heavy')
+        return
+    user_ids = followers.values_list('user_id', flat=True)
+    _insert(user_ids.iterator(), [post])
+
+
+def backfill(user_id, author_id):
+    if author_id in heavy_authors():
+        return
+    posts = Post.objects.filter(author_id=author_id).only(
+        'pk', 'author_id', 'pub_date'
+    )[:settings.POSTS_TIMELINE_BACKFILL]
+    _insert([user_id], list(posts))
+
+
+def rebuild(user_id):
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    for author_id in Follow.objects.filter(user_id=user_id).values_list(
+        'author_id', flat=True
+    ):
+        backfill(user_id, author_id)
+
+
+def _before(cursor, date_field, id_field):
+    pub_date, post_id = cursor
+    return Q(**{f'{date_field}__lt': pub_date}) | Q(**{
+        date_field: pub_date, f'{id_field}__lt': post_id,
+    })
+
+
+def read(user, cursor=None, limit=10):
+    """Return a page of the user's timeline and the cursor of the next one.
+
+    Posts of light authors come from the materialized entries, posts of
+    heavy authors are read from the posts table at request time; both
+    sides are keyset-paginated on (pub_date, id) and merged. Authors
+    pending deletion are hidden on both sides.
+    """
+    hidden = pending(DeletionJob.USER)
+    entries = TimelineEntry.objects.filter(user=user).exclude(
+        author_id__in=hidden
+    )
+    # Counted in SQL, for the followed authors only: the cached set of
+    # heavy authors could be too long to pass as query parameters.
+    followed_heavy = _heavy(Follow.objects.filter(
+        author__in=Follow.objects.filter(user=user).values('author')
+    ))
+    fan_in = Post.objects.filter(author__in=followed_heavy).exclude(
+        author__in=hidden
+    )
+    if cursor is not None:
+        entries = entries.filter(_before(cursor, 'pub_date', 'post_id'))
+        fan_in = fan_in.filter(_before(cursor, 'pub_date', 'pk'))
+    keys = set(entries.order_by('-pub_date', '-post_id').values_list(
+        'pub_date', 'post_id')[:limit + 1])
+    keys |= set(fan_in.order_by('-pub_date', '-pk').values_list(
+        'pub_date', 'pk')[:limit + 1])
+    keys = sorted(keys, reverse=True)
+    page, rest = keys[:limit], keys[limit:]
+    posts = Post.objects.select_related('author', 'group').defer(
+        *SUMMARY_DEFERRED
+    ).in_bulk([post_id for _, post_id in page])
+    next_cursor = encode_cursor(*page[-1]) if rest else None
+    page_posts = [posts[post_id] for _, post_id in page if post_id in posts]
+    return page_posts, next_cursor
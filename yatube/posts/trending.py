@@ -0,0 +1,121 @@
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from core.cache import MISSING, LRUCache
+from core.counters import BufferedCounter
+
+from .deletion import pending
+from .feeds import SUMMARY_DEFERRED
+from .models import DeletionJob, Group, Post, TrendingScore
+
+# Half-lives between two landmarks; keeps the factors below 2 ** 32.
+PERIOD = 32
+
+
+def landmark(now=None):
+    """Return ``(period, factor)`` for an event happening at ``now``.
+
+    Scores use forward decay: instead of every stored score shrinking as
+    time passes, an event adds its weight times ``2 ** (t / half-life)``
+    measured from the landmark of its period. Ordering by the stored
+    value is then ordering by the decayed score, and nothing has to be
+    rewritten until the landmark moves every ``PERIOD`` half-lives.
+    """
+    if now is None:
+        now = time.time()
+    half_lives = now / settings.POSTS_TRENDING_HALF_LIFE
+    period = int(half_lives // PERIOD)
+    return period, 2 ** (half_lives - period * PERIOD)
+
+
+def record(kind, object_id, event):
+    period, factor = landmark()
+    scores.incr(
+        (kind, object_id, period),
+        settings.POSTS_TRENDING_WEIGHTS[event] * factor,
+    )
+
+
+def _rebase(period):
+    stale = TrendingScore.objects.filter(period__lt=period)
+    stale.filter(period=period - 1).update(
+        score=F('score') * 2.0 ** -PERIOD, period=period
+    )
+    # Anything older has decayed below 2 ** -32 of a single fresh event.
+    stale.delete()
+
+
+def flush_scores(counts):
+    period = landmark()[0]
+    with transaction.atomic():
+        _rebase(period)
+        for (kind, object_id, event_period), delta in counts.items():
+            delta *= 2.0 ** ((event_period - period) * PERIOD)
+            rows = TrendingScore.objects.filter(
+                kind=kind, object_id=object_id
+            )
+            if rows.update(score=F('score') + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    TrendingScore.objects.create(
+                        kind=kind, object_id=object_id,
+                        period=period, score=delta,
+                    )
+            except IntegrityError:
+                rows.update(score=F('score') + delta)
+    snapshots.clear()
+
+
+scores = BufferedCounter(
+    flush_scores,
+    interval=settings.POSTS_TRENDING_FLUSH_INTERVAL,
+    max_pending=settings.POSTS_TRENDING_MAX_PENDING,
+)
+snapshots = LRUCache(
+    max_size=len(TrendingScore.KIND_CHOICES),
+    timeout=settings.POSTS_TRENDING_REFRESH,
+)
+
+
+def _top_ids(kind):
+    # Rows not rebased yet sort below the current period, never above.
+    return list(TrendingScore.objects.filter(kind=kind).order_by(
+        '-period', '-score'
+    ).values_list('object_id', flat=True)[
+        :2 * settings.POSTS_TRENDING_COUNT
+    ])
+
+
+def _top(kind, queryset):
+    """Top objects of ``kind``, kept in process memory between refreshes.
+
+    Twice as many ids as shown are read, so objects deleted or hidden
+    since they were scored can be skipped.
+    """
+    items = snapshots.get(kind)
+    if items is MISSING:
+        ids = _top_ids(kind)
+        objects = queryset.in_bulk(ids)
+        items = [
+            objects[pk] for pk in ids if pk in objects
+        ][:settings.POSTS_TRENDING_COUNT]
+        snapshots.set(kind, items)
+    return items
+
+
+def trending_posts():
+    return _top(TrendingScore.POST, Post.objects.select_related(
+        'author', 'group'
+    ).defer(*SUMMARY_DEFERRED).exclude(
+        author__in=pending(DeletionJob.USER)
+    ))
+
+
+def trending_groups():
+    return _top(TrendingScore.GROUP, Group.objects.exclude(
+        pk__in=pending(DeletionJob.GROUP)
+    ))
@@ -8,7 +8,55 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'archive/<int:year>/<int:month>/',
+        views.month_archive,
+        name='month_archive'
+    ),
+    path(
+        'group/<slug:slug>/archive/<int:year>/<int:month>/',
+        views.group_month_archive,
+        name='group_month_archive'
+    ),
+    path(
+        'profile/<str:username>/archive/<int:year>/<int:month>/',
+        views.profile_month_archive,
+        name='profile_month_archive'
+    ),
+    path('groups/', views.group_index, name='group_index'),
+    path(
+        'groups/by/<slug:sort>/',
+        views.group_index,
+        name='group_index'
+    ),
+    path(
+        'groups/autocomplete/',
+        views.group_autocomplete,
+        name='group_autocomplete'
+    ),
+    path('sitemap.xml', views.sitemap, name='sitemap'),
+    path(
+        'sitemaps/<slug:name>.xml',
+        views.sitemap,
+        name='sitemap_chunk'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path(
+        'posts/<int:post_id>/comment/',
+        views.add_comment,
+        name='add_comment'
+    ),
+    path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'profile/<str:username>/follow/',
+        views.profile_follow,
+        name='profile_follow'
+    ),
+    path(
+        'profile/<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow'
+    ),
 ]
@@ -1,28 +1,44 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import FileResponse, Http404, JsonResponse
+from django.urls import reverse
 from django.shortcuts import get_object_or_404, redirect, render
 
-from .forms import PostForm
-from .models import Group, Post
+from core.ratelimit import ratelimit
+from core.tasks import enqueue
+
+from . import group_stats, months, related, sitemaps, timeline, trending
+from .archive import get_post_or_404
+from .counters import post_views
+from .feeds import author_feed, group_feed, index_feed
+from .forms import CommentForm, PostForm
+from .lookups import get_author_or_404, get_group_or_404, group_prefix
+from .models import (
+    Comment, Follow, Group, Post, TimelineEntry, TrendingScore
+)
+from .static_site import PRERENDER
 
 User = get_user_model()
 
 
 def index(request):
-    post_list = Post.objects.all()
+    post_list = index_feed()
     paginator = Paginator(post_list, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
+        'trending_posts': trending.trending_posts(),
+        'trending_groups': trending.trending_groups(),
     }
     return render(request, 'posts/index.html', context)
 
 
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    group = get_group_or_404(slug)
+    posts = group_feed(group)
     paginator = Paginator(posts, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -35,42 +51,170 @@ def group_posts(request, slug):
 
 
 def profile(request, username):
-    profile = get_object_or_404(User, username=username)
-    user_posts = profile.posts.all()
+    profile = get_author_or_404(username).as_user()
+    user_posts = author_feed(profile)
     posts_count = user_posts.count()
     paginator = Paginator(user_posts, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author_id=profile.pk
+    ).exists()
     context = {
         'profile': profile,
         'user_posts': user_posts,
         'posts_count': posts_count,
         'page_obj': page_obj,
+        'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+def _month_archive(request, year, month, scope, url_name, args, **filters):
+    # The month is bounded by the first day of the next one, which must
+    # fit in a datetime too.
+    if not 1 <= month <= 12 or year < 1 or (year, month) >= (9999, 12):
+        raise Http404('No such month.')
+    navigation = months.navigation(scope)
+    total = next((
+        row.count for row in navigation
+        if (row.year, row.month) == (year, month)
+    ), 0)
+    posts = months.month_posts(year, month, total, **filters)
+    paginator = Paginator(posts, 10)
+    page_number = request.GET.get('page')
+    return {
+        'page_obj': paginator.get_page(page_number),
+        'month_start': months.month_bounds(year, month)[0],
+        'months': [
+            {
+                'date': months.month_bounds(row.year, row.month)[0],
+                'count': row.count,
+                'url': reverse(url_name, args=(*args, row.year, row.month)),
+                'current': (row.year, row.month) == (year, month),
+            }
+            for row in navigation
+        ],
+    }
+
+
+def month_archive(request, year, month):
+    context = _month_archive(
+        request, year, month, months.SITE, 'posts:month_archive', ()
+    )
+    return render(request, 'posts/month_archive.html', context)
+
+
+def group_month_archive(request, slug, year, month):
+    group = get_group_or_404(slug)
+    context = _month_archive(
+        request, year, month, months.group_scope(group.pk),
+        'posts:group_month_archive', (group.slug,), group_id=group.pk,
+    )
+    context['group'] = group
+    return render(request, 'posts/month_archive.html', context)
+
+
+def profile_month_archive(request, username, year, month):
+    profile = get_author_or_404(username).as_user()
+    context = _month_archive(
+        request, year, month, months.author_scope(profile.pk),
+        'posts:profile_month_archive', (profile.username,),
+        author_id=profile.pk,
+    )
+    context['profile'] = profile
+    return render(request, 'posts/month_archive.html', context)
+
+
+def group_index(request, sort='posts'):
+    if sort not in group_stats.ORDERINGS:
+        raise Http404('No such ordering.')
+    paginator = Paginator(group_stats.directory(sort), 10)
+    page_number = request.GET.get('page')
+    context = {
+        'page_obj': paginator.get_page(page_number),
+        'sort': sort,
+        'rate_days': settings.POSTS_GROUP_RATE_DAYS,
+    }
+    return render(request, 'posts/group_index.html', context)
+
+
+def group_autocomplete(request):
+    term = request.GET.get('q', '')
+    groups = []
+    if term.strip():
+        groups = Group.objects.filter(group_prefix(term)).order_by(
+            'title_key'
+        ).values_list('pk', 'title')
+        groups = groups[:settings.POSTS_GROUP_AUTOCOMPLETE_LIMIT]
+    return JsonResponse({'results': [
+        {'id': pk, 'text': title} for pk, title in groups
+    ]})
+
+
+def sitemap(request, name='sitemap'):
+    try:
+        return FileResponse(
+            open(sitemaps.path(f'{name}.xml'), 'rb'),
+            content_type='application/xml',
+        )
+    except FileNotFoundError:
+        raise Http404('No such sitemap.')
+
+
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    user_posts = post.author.posts.all()
+    post = get_post_or_404(post_id)
+    if PRERENDER not in request.META:
+        post_views.incr(post.pk)
+        trending.record(TrendingScore.POST, post.pk, 'view')
+    user_posts = author_feed(post.author)
     posts_count = user_posts.count()
     post_title = post.text[:30]
+    try:
+        after = int(request.GET.get('after', 0))
+    except ValueError:
+        after = 0
+    comments = list(
+        Comment.objects.filter(post_id=post.pk, pk__gt=after)
+        .select_related('author')[:settings.POSTS_COMMENTS_PER_PAGE + 1]
+    )
+    next_after = None
+    if len(comments) > settings.POSTS_COMMENTS_PER_PAGE:
+        comments = comments[:-1]
+        next_after = comments[-1].pk
     context = {
         'post': post,
         'user_posts': user_posts,
         'posts_count': posts_count,
         'post_title': post_title,
+        'comments': comments,
+        'next_after': next_after,
+        'related_posts': related.related_posts(post),
+        'form': CommentForm(),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+def add_comment(request, post_id):
+    form = CommentForm(request.POST or None)
+    if form.is_valid() and Post.objects.filter(pk=post_id).exists():
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post_id = post_id
+        comment.save()
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@ratelimit('posts:post_create')
 def post_create(request):
     form = PostForm(request.POST or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        enqueue('posts.post_created', post_id=post.pk)
         return redirect('posts:profile', username=request.user.username)
     context = {
         'form': form,
@@ -79,6 +223,7 @@ def post_create(request):
 
 
 @login_required
+@ratelimit('posts:post_edit')
 def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     if request.user != post.author:
@@ -86,6 +231,7 @@ def post_edit(request, post_id):
     form = PostForm(request.POST or None, instance=post)
     if form.is_valid():
         post = form.save()
+        enqueue('posts.post_edited', post_id=post.pk)
         return redirect('posts:post_detail', post_id)
     context = {
         'post': post,
@@ -93,3 +239,38 @@ def post_edit(request, post_id):
         'is_edit': True,
     }
     return render(request, 'posts/create_post.html', context)
+
+
+@login_required
+def follow_index(request):
+    cursor = timeline.decode_cursor(request.GET.get('before'))
+    posts, next_cursor = timeline.read(request.user, cursor)
+    context = {
+        'posts': posts,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_author_or_404(username)
+    if author.pk != request.user.pk:
+        _, created = Follow.objects.get_or_create(
+            user=request.user, author_id=author.pk
+        )
+        if created:
+            enqueue(
+                'posts.follow', user_id=request.user.pk, author_id=author.pk
+            )
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_author_or_404(username)
+    Follow.objects.filter(user=request.user, author_id=author.pk).delete()
+    TimelineEntry.objects.filter(
+        user=request.user, author_id=author.pk
+    ).delete()
+    return redirect('posts:profile', username=username)
@@ -0,0 +1,37 @@
+from django import forms
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """Select rendering only the chosen option; the rest come from ``url``.
+
+    ``static/js/autocomplete.js`` adds a search box that fills the options
+    from the JSON endpoint, so pages never list the whole queryset.
+    """
+
+    class Media:
+        js = ('js/autocomplete.js',)
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse(
+            self.url
+        )
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        choices = self.choices
+        selected = choices.queryset.filter(
+            pk__in=[item for item in value if str(item).isdigit()]
+        )
+        self.choices = [choices.choice(obj) for obj in selected]
+        if choices.field.empty_label is not None:
+            self.choices.insert(0, ('', choices.field.empty_label))
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
@@ -0,0 +1,28 @@
+document.querySelectorAll('select[data-autocomplete-url]').forEach(function (select) {
+  var input = document.createElement('input');
+  var timer;
+  input.type = 'search';
+  input.className = 'form-control mb-1';
+  input.placeholder = 'Начните вводить название';
+  select.parentNode.insertBefore(input, select);
+  input.addEventListener('input', function () {
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+      var url = select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(input.value);
+      fetch(url).then(function (response) {
+        return response.json();
+      }).then(function (data) {
+        Array.from(select.options).forEach(function (option) {
+          if (option.value && !option.selected) {
+            option.remove();
+          }
+        });
+        data.results.forEach(function (item) {
+          if (String(item.id) !== select.value) {
+            select.add(new Option(item.text, item.id));
+          }
+        });
+      });
+    }, 200);
+  });
+});
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.signals import user_logged_out
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import cache
+
+User = get_user_model()
+
+
+def user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _dump(user):
+    if user is None:
+        return None
+    return {
+        'fields': {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.attname != 'password'
+        },
+        'session_hash': user.get_session_auth_hash(),
+    }
+
+
+def _load(values):
+    """Build a fresh user from cached values, its password deferred."""
+    fields = values['fields']
+    user = User.from_db(DEFAULT_DB_ALIAS, list(fields), list(fields.values()))
+    get_session_auth_hash = user.get_session_auth_hash
+
+    def cached_session_auth_hash():
+        # Once the password is loaded or changed, hash the real one.
+        if 'password' in user.__dict__:
+            return get_session_auth_hash()
+        return values['session_hash']
+
+    user.get_session_auth_hash = cached_session_auth_hash
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that keeps the session's user in the tiered cache.
+
+    Only the field values are cached, with the session hash in place of
+    the password hash, and every call builds its own instance, so no two
+    requests share a user. The session hash check still logs out other
+    sessions after a password change; saving or deleting the user and
+    logging out drop the entry.
+    """
+
+    def get_user(self, user_id):
+        values = cache.get_or_set(
+            user_key(user_id),
+            lambda: _dump(super(CachedModelBackend, self).get_user(user_id)),
+            timeout=settings.AUTH_USER_CACHE_TIMEOUT,
+            tags=(user_key(user_id),),
+        )
+        if values is None:
+            return None
+        user = _load(values)
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    cache.invalidate_tags(user_key(instance.pk))
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out(sender, user, **kwargs):
+    if user is not None:
+        cache.invalidate_tags(user_key(user.pk))
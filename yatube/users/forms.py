@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+from django.template import loader
+
+from .mail import queue_mail
 
 User = get_user_model()
 
@@ -8,3 +11,20 @@ class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        subject = ''.join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = ''
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(
+                html_email_template_name, context)
+        queue_mail(
+            subject, body, from_email, [to_email], html_body,
+            dedupe_key=f'password_reset:{context["user"].pk}',
+        )
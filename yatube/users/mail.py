@@ -0,0 +1,125 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.tasks import enqueue
+
+from .models import OutboxMessage
+
+
+def _pending(now):
+    """Unsent messages that no sender holds a live lease on."""
+    return OutboxMessage.objects.filter(sent__isnull=True).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    )
+
+
+def queue_mail(subject, body, from_email, to, html_body='', dedupe_key=''):
+    """Store a message in the outbox instead of sending it right away.
+
+    A pending message with the same ``dedupe_key`` is replaced, so
+    repeated requests produce one email with the latest content.
+    """
+    fields = {
+        'subject': subject,
+        'body': body,
+        'html_body': html_body or '',
+        'from_email': from_email or settings.DEFAULT_FROM_EMAIL,
+        'to': ','.join(to),
+    }
+    if dedupe_key:
+        updated = _pending(timezone.now()).filter(
+            dedupe_key=dedupe_key
+        ).update(**fields)
+        if updated:
+            return
+    OutboxMessage.objects.create(dedupe_key=dedupe_key, **fields)
+    enqueue('users.send_outbox')
+
+
+class OutboxBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            html_body = ''
+            for content, mimetype in getattr(message, 'alternatives', []):
+                if mimetype == 'text/html':
+                    html_body = content
+            queue_mail(
+                message.subject, message.body, message.from_email,
+                message.recipients(), html_body,
+            )
+        return len(email_messages)
+
+
+def _build(outbox_message, connection):
+    message = EmailMultiAlternatives(
+        outbox_message.subject,
+        outbox_message.body,
+        outbox_message.from_email,
+        outbox_message.to.split(','),
+        connection=connection,
+    )
+    if outbox_message.html_body:
+        message.attach_alternative(outbox_message.html_body, 'text/html')
+    return message
+
+
+def claim(batch_size=None, now=None):
+    """Lease a batch of pending messages to the caller.
+
+    Works like ``core.tasks.claim``: the conditional UPDATE hands each
+    message to one sender only, and the lease of a sender that died
+    mid-batch expires so the messages are picked up again.
+    """
+    now = now or timezone.now()
+    ids = list(
+        _pending(now).values_list('pk', flat=True)
+        [:batch_size or settings.OUTBOX_BATCH_SIZE]
+    )
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        _pending(now).filter(pk__in=ids).update(
+            locked_until=now + timedelta(
+                seconds=settings.OUTBOX_LEASE_SECONDS
+            ),
+            lock_token=token,
+        )
+    return list(OutboxMessage.objects.filter(pk__in=ids, lock_token=token))
+
+
+def send_pending(batch_size=None):
+    """Send one batch of pending messages over a single connection.
+
+    Return the number of messages sent; 0 once none are left to claim.
+    Call it outside a transaction: no database lock is held while the
+    mail server is talked to, and the ``sent`` mark of each batch is
+    committed as soon as the batch is delivered.
+    """
+    batch = claim(batch_size)
+    if not batch:
+        return 0
+    claimed = OutboxMessage.objects.filter(
+        pk__in=[message.pk for message in batch],
+        lock_token=batch[0].lock_token,
+    )
+    try:
+        with get_connection(settings.OUTBOX_EMAIL_BACKEND) as connection:
+            connection.send_messages(
+                [_build(message, connection) for message in batch]
+            )
+    except Exception:
+        # Hand the batch back at once for the retry of the task.
+        with transaction.atomic():
+            claimed.update(locked_until=None, lock_token='')
+        raise
+    with transaction.atomic():
+        claimed.update(sent=timezone.now(), locked_until=None)
+    return len(batch)
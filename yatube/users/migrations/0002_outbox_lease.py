@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='lock_token',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
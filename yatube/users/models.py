@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class OutboxMessage(models.Model):
+    dedupe_key = models.CharField(max_length=100, blank=True, db_index=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.TextField()
+    created = models.DateTimeField(auto_now_add=True)
+    sent = models.DateTimeField(null=True, blank=True, db_index=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    lock_token = models.CharField(max_length=32, blank=True)
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
+
+    class Meta:
+        ordering = ('pk',)
@@ -0,0 +1,11 @@
+from core.tasks import handler
+
+from .mail import send_pending
+
+
+# Sent outside the task transaction: each batch commits its own lease
+# and ``sent`` mark, so a failure never rolls back delivered batches.
+@handler('users.send_outbox', atomic=False)
+def send_outbox(payloads):
+    while send_pending():
+        pass
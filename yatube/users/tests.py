@@ -0,0 +1,162 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import cache
+from core.models import Task
+from core.tasks import run_pending
+
+from .backends import CachedModelBackend, user_key
+from .mail import claim, send_pending
+from .models import OutboxMessage
+
+User = get_user_model()
+
+
+class FlakyBackend(EmailBackend):
+    """Drops the connection on every second batch."""
+
+    calls = 0
+
+    def send_messages(self, messages):
+        FlakyBackend.calls += 1
+        if FlakyBackend.calls % 2 == 0:
+            raise ConnectionError('connection reset')
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='users.mail.OutboxBackend',
+    OUTBOX_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class OutboxTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='Name', email='name@example.com', password='pass')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_password_reset_queued_and_deduplicated(self):
+        """Повторные запросы сброса пароля дают одно письмо"""
+        for _ in range(3):
+            response = self.guest_client.post(
+                reverse('users:password_reset_form'),
+                {'email': self.user.email},
+            )
+            self.assertRedirects(
+                response, reverse('users:password_reset_done'))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+        self.assertFalse(
+            OutboxMessage.objects.filter(sent__isnull=True).exists())
+
+    def test_send_mail_goes_through_outbox(self):
+        """Обычные письма отправляются пачкой через outbox"""
+        for n in range(3):
+            mail.send_mail(f'Тема {n}', 'Текст', None, ['a@example.com'])
+        self.assertEqual(OutboxMessage.objects.count(), 3)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_claimed_messages_sent_once(self):
+        """Письмо, взятое одним отправителем, не уходит повторно"""
+        for n in range(3):
+            mail.send_mail(f'Тема {n}', 'Текст', None, ['a@example.com'])
+        held = claim(batch_size=2)
+        self.assertEqual(len(held), 2)
+        self.assertEqual(send_pending(), 1)
+        self.assertEqual(send_pending(), 0)
+        self.assertEqual(len(mail.outbox), 1)
+        # The first sender died; its lease runs out.
+        OutboxMessage.objects.filter(sent__isnull=True).update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(send_pending(), 2)
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(
+        OUTBOX_BATCH_SIZE=1, OUTBOX_EMAIL_BACKEND='users.tests.FlakyBackend')
+    def test_failed_batch_keeps_delivered_ones(self):
+        """Сбой отправки не заставляет повторно слать доставленные письма"""
+        FlakyBackend.calls = 0
+        for n in range(2):
+            mail.send_mail(f's{n}', 'Текст', None, ['a@example.com'])
+        with self.assertLogs('core.tasks', 'ERROR'):
+            run_pending()
+        Task.objects.update(run_after=timezone.now())
+        run_pending()
+        self.assertEqual(
+            [message.subject for message in mail.outbox], ['s0', 's1'])
+        self.assertFalse(
+            OutboxMessage.objects.filter(sent__isnull=True).exists())
+
+
+class CachedAuthTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='Name', password='old-password-123')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.login(
+            username='Name', password='old-password-123')
+
+    def test_session_and_user_served_from_cache(self):
+        """Сессия и пользователь берутся из кэша без запросов к БД"""
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.authorized_client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_each_request_gets_own_user(self):
+        """Каждый запрос получает свой экземпляр пользователя без хэша"""
+        backend = CachedModelBackend()
+        first = backend.get_user(self.user.pk)
+        second = backend.get_user(self.user.pk)
+        self.assertIsNot(first, second)
+        self.assertEqual(first, self.user)
+        self.assertIn('password', first.get_deferred_fields())
+        self.assertEqual(
+            first.get_session_auth_hash(), self.user.get_session_auth_hash())
+        key = user_key(self.user.pk)
+        self.assertNotIn('password', cache.get(key, tags=(key,))['fields'])
+        first.set_password('changed-password-789')
+        self.assertNotEqual(
+            first.get_session_auth_hash(), second.get_session_auth_hash())
+
+    def test_password_change_logs_out_other_sessions(self):
+        """После смены пароля другие сессии разлогиниваются"""
+        other_client = Client()
+        other_client.login(username='Name', password='old-password-123')
+        url = reverse('about:author')
+        other_client.get(url)
+        self.authorized_client.post(reverse('users:password_change'), {
+            'old_password': 'old-password-123',
+            'new_password1': 'new-password-456',
+            'new_password2': 'new-password-456',
+        })
+        response = other_client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+        response = self.authorized_client.get(url)
+        self.assertTrue(response.context['user'].is_authenticated)
+
+    def test_logout_drops_cached_user(self):
+        """Выход из аккаунта сбрасывает кэш пользователя"""
+        self.authorized_client.get(reverse('about:author'))
+        self.authorized_client.get(reverse('users:logout'))
+        response = self.authorized_client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
@@ -7,7 +7,10 @@ from django.contrib.auth.views import (LoginView, LogoutView,
                                        PasswordResetView)
 from django.urls import path
 
+from core.ratelimit import ratelimit
+
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -17,10 +20,15 @@ urlpatterns = [
         LogoutView.as_view(template_name='users/logged_out.html'),
         name='logout'
     ),
-    path('signup/', views.SignUp.as_view(), name='signup'),
+    path(
+        'signup/',
+        ratelimit('users:signup')(views.SignUp.as_view()),
+        name='signup'
+    ),
     path(
         'login/',
-        LoginView.as_view(template_name='users/login.html'),
+        ratelimit('users:login')(
+            LoginView.as_view(template_name='users/login.html')),
         name='login'
     ),
     path(
@@ -37,8 +45,9 @@ urlpatterns = [
     ),
     path(
         'password_reset/',
-        PasswordResetView.as_view(
-            template_name='users/password_reset_form.html'),
+        ratelimit('users:password_reset_form')(PasswordResetView.as_view(
+            template_name='users/password_reset_form.html',
+            form_class=QueuedPasswordResetForm)),
         name='password_reset_form',
     ),
     path(
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -86,6 +88,41 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    },
+}
+
+# Tests must not read, fill or wipe the cache of a running server.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+if TESTING:
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared',
+    }
+
+TIERED_CACHE = {
+    'L2': 'shared',
+    'L1_MAX_SIZE': 1000,
+    'L1_TIMEOUT': 60,
+    'TIMEOUT': 300,
+    'TAG_TIMEOUT': 1,
+    'LOCK_TIMEOUT': 10,
+}
+
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'shared'
+
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -128,6 +165,9 @@ USE_TZ = True
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
 
 
 LOGIN_URL = 'users:login'
@@ -135,5 +175,74 @@ LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'users.mail.OutboxBackend'
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_LEASE_SECONDS = 300
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+
+POSTS_PREVIEW_CHARS = 500
+POSTS_COMMENTS_PER_PAGE = 20
+POSTS_GROUP_AUTOCOMPLETE_LIMIT = 20
+POSTS_GROUP_RATE_DAYS = 30
+POSTS_GROUP_STATS_BATCH_SIZE = 1000
+POSTS_VIEWS_FLUSH_INTERVAL = 10
+POSTS_VIEWS_MAX_PENDING = 10000
+POSTS_TRENDING_COUNT = 5
+POSTS_TRENDING_HALF_LIFE = 6 * 60 * 60
+POSTS_TRENDING_WEIGHTS = {'view': 1, 'comment': 5, 'post': 1}
+POSTS_TRENDING_FLUSH_INTERVAL = 10
+POSTS_TRENDING_MAX_PENDING = 10000
+POSTS_TRENDING_REFRESH = 30
+POSTS_RELATED_COUNT = 5
+POSTS_RELATED_MAX_POSTINGS = 10000
+POSTS_RELATED_BATCH_SIZE = 1000
+# Changing the shingle size, bands or rows needs index_signatures --all.
+POSTS_DUPLICATE_MIN_WORDS = 8
+POSTS_DUPLICATE_SHINGLE_WORDS = 3
+POSTS_DUPLICATE_BANDS = 16
+POSTS_DUPLICATE_ROWS = 4
+POSTS_DUPLICATE_MAX_CANDIDATES = 50
+POSTS_DUPLICATE_FLAG_THRESHOLD = 0.6
+POSTS_DUPLICATE_REJECT_THRESHOLD = 0.9
+POSTS_DUPLICATE_BATCH_SIZE = 1000
+POSTS_COMPRESS_BODY = False
+POSTS_COMPRESS_MIN_LENGTH = 4096
+POSTS_COMPRESS_LEVEL = 6
+POSTS_ARCHIVE_AFTER_DAYS = 365
+POSTS_ARCHIVE_BATCH_SIZE = 1000
+POSTS_DELETION_BATCH_SIZE = 500
+POSTS_FANOUT_MAX_FOLLOWERS = 1000
+POSTS_FANOUT_BATCH_SIZE = 500
+POSTS_HEAVY_AUTHORS_TIMEOUT = 60
+POSTS_TIMELINE_BACKFILL = 200
+POSTS_BULK_CHUNK_SIZE = 1000
+POSTS_SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+POSTS_SITEMAP_BASE_URL = 'http://127.0.0.1:8000'
+POSTS_SITEMAP_CHUNK_SIZE = 50000
+POSTS_SITEMAP_BATCH_SIZE = 5000
+POSTS_STATIC_SITE_ROOT = os.path.join(BASE_DIR, 'static_site')
+
+
+TASKS_WORKERS = 4
+TASKS_POLL_INTERVAL = 1
+TASKS_BATCH_SIZE = 50
+TASKS_LEASE_SECONDS = 300
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_BACKOFF = 10
+TASKS_RETRY_BACKOFF_MAX = 3600
+
+
+# Admin changelists stop counting rows past this many.
+ADMIN_COUNT_LIMIT = 10000
+
+# (requests, seconds) per user, or per IP address for anonymous clients.
+RATELIMIT_CACHE = 'shared'
+RATELIMITS = {
+    'posts:post_create': (20, 60),
+    'posts:post_edit': (30, 60),
+    'users:signup': (5, 600),
+    'users:login': (10, 60),
+    'users:password_reset_form': (5, 600),
+}
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+from posts import trending  # noqa: E402
+from posts.counters import post_views  # noqa: E402
+
+post_views.start()
+trending.scores.start()